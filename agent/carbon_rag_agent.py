@@ -7,12 +7,28 @@ Carbon Data Analysis RAG Agent
 """
 
 import os
+import re
+import threading
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 import seaborn as sns
 import io
 import base64
+from concurrent.futures import ThreadPoolExecutor
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+from PIL import Image
+try:
+    import polars as pl
+except ImportError:  # polars 미설치 시 pandas merge 사용
+    pl = None
+try:
+    import fireducks.pandas as fpd
+except ImportError:  # fireducks 미설치 시 pandas DataFrame 그대로 사용
+    fpd = None
 from typing import Dict, List, Optional, Any
 from dotenv import load_dotenv
 from langchain_experimental.agents.agent_toolkits import create_pandas_dataframe_agent
@@ -27,6 +43,44 @@ warnings.filterwarnings('ignore')
 plt.rcParams['font.family'] = ['Malgun Gothic', 'DejaVu Sans']
 plt.rcParams['axes.unicode_minus'] = False
 
+# 질문에서 연도(19xx/20xx) 추출용 정규식 - '2017년'처럼 한글이 바로 붙어도 매칭
+_YEAR_RE = re.compile(r'(?<!\d)(?:19|20)\d{2}(?!\d)')
+
+# 시각화 키워드 -> 차트 종류 (정규식 하나로 질문을 한 번만 스캔)
+_CHART_KEYWORDS = {
+    '추이': 'line', '변화': 'line', '트렌드': 'line', '시간': 'line',
+    '비교': 'bar', '차이': 'bar', '대비': 'bar',
+    '분포': 'pie', '비율': 'pie',
+}
+_CHART_RE = re.compile('|'.join(map(re.escape, _CHART_KEYWORDS)))
+
+# LLM 호출 없이 pandas 조회로 바로 답할 수 있는 질문 패턴 -> 처리 메서드 이름
+# 질문 전체가 단순 조회 형태일 때만 매칭 (이유/추이/차트 요청 등 뒤에 다른 내용이 붙으면 LLM으로 처리)
+_FASTPATH = [
+    (re.compile(r'^\s*(?:이\s*)?데이터(?:에는|의|는)?\s*(?:총\s*)?몇\s*개의?\s*행\s*(?:이|가)?\s*'
+                r'(?:있어|있어요|있나요|있습니까)?\s*\??\s*$'), '_answer_row_count'),
+    (re.compile(r'^\s*(?:19|20)\d{2}\s*년?도?\s*의?\s*총\s*배출량\s*(?:은|는)?\s*'
+                r'(?:얼마(?:야|예요|인가요|입니까)?)?\s*\??\s*$'), '_answer_total_emission'),
+]
+
+
+# 파일별 로드 결과 캐시: 파일 경로 -> (mtime, DataFrame)
+# 에이전트 재초기화 시 변경되지 않은 파일은 다시 파싱하지 않음
+_FRAME_CACHE: Dict[str, tuple] = {}
+
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def _render_chart(_agent: "CarbonDataRAGAgent", query_key: tuple, df_fingerprint: int,
+                  kind: str, _query: str) -> Optional[str]:
+    """
+    전체 데이터 차트 렌더링 결과 캐시 (Streamlit 재실행 시 PNG 재생성 방지)
+    
+    캐시 키는 (query_key, df_fingerprint, kind)이며, 밑줄로 시작하는
+    인자는 해싱에서 제외됩니다.
+    """
+    return _agent._render(kind, _agent.main_df, _query)
+
+
 class CarbonDataRAGAgent:
     """탄소 데이터 분석을 위한 RAG 에이전트 클래스"""
     
@@ -42,6 +96,18 @@ class CarbonDataRAGAgent:
         self.agent = None
         self.stream_parser = AgentStreamParser()
         self.unified_df = None
+        self._df_fingerprint: Optional[int] = None
+        self._by_year: Optional[pd.DataFrame] = None
+        self._numeric_cols: Optional[List[str]] = None
+        
+        # 차트 렌더링용 Figure/Canvas 재사용 (pyplot 전역 상태 미사용)
+        # 화면 표시용이므로 dpi=90으로 충분 (인코딩 비용 감소)
+        self._fig = Figure(figsize=(12, 8), dpi=90)
+        self._canvas = FigureCanvasAgg(self._fig)
+        self._ax = self._fig.add_subplot()
+        # 레이아웃을 고정해 렌더링마다 tight_layout 계산(추가 draw) 생략
+        self._fig.subplots_adjust(left=0.1, right=0.95, top=0.92, bottom=0.15)
+        self._render_lock = threading.Lock()
         
         # 환경 변수 로드
         load_dotenv()
@@ -59,44 +125,121 @@ class CarbonDataRAGAgent:
                 return
             
             # CSV 파일 목록 가져오기
-            csv_files = [f for f in os.listdir(self.data_folder_path) if f.endswith('.csv')]
+            with os.scandir(self.data_folder_path) as entries:
+                csv_files = [e.name for e in entries if e.name.endswith('.csv') and e.is_file()]
             
             if not csv_files:
                 st.warning("데이터 폴더에서 CSV 파일을 찾을 수 없습니다.")
                 return
             
-            # 각 CSV 파일 로드
-            for csv_file in csv_files:
+            # 각 CSV 파일을 스레드 풀에서 병렬 로드
+            def _load_one(csv_file: str):
                 file_path = os.path.join(self.data_folder_path, csv_file)
+                # 파일명에서 확장자 제거하여 키로 사용
+                file_key = os.path.splitext(csv_file)[0]
                 try:
-                    # 파일명에서 확장자 제거하여 키로 사용
-                    file_key = os.path.splitext(csv_file)[0]
+                    # Excel 파일인 경우 스킵 (CSV만 처리)
+                    if "기업_규모_지역별" in csv_file:
+                        return file_key, None, None
                     
-                    # 인코딩 시도 (euc-kr 우선, 실패시 utf-8)
-                    try:
-                        df = pd.read_csv(file_path, encoding='euc-kr')
-                    except UnicodeDecodeError:
-                        df = pd.read_csv(file_path, encoding='utf-8')
+                    # 이전 초기화에서 읽은 파일이 변경되지 않았으면 재사용
+                    mtime = os.path.getmtime(file_path)
+                    cached = _FRAME_CACHE.get(file_path)
+                    if cached is not None and cached[0] == mtime:
+                        return file_key, cached[1], None
+                    
+                    # CSV 로드 (Parquet 캐시 우선)
+                    df = self._read_csv_cached(file_path)
                     
                     # 특별한 전처리가 필요한 파일들 처리
                     if "국가 온실가스 인벤토리" in csv_file:
                         df = self._preprocess_inventory_data(df)
-                    elif "기업_규모_지역별" in csv_file:
-                        # Excel 파일인 경우 스킵 (CSV만 처리)
-                        continue
                     
-                    self.dataframes[file_key] = df
+                    _FRAME_CACHE[file_path] = (mtime, df)
+                    return file_key, df, None
                     
                 except Exception as e:
-                    st.warning(f"파일 로드 실패: {csv_file} - {str(e)}")
-                    continue
+                    return file_key, None, e
+            
+            with ThreadPoolExecutor(max_workers=min(8, len(csv_files))) as executor:
+                results = list(executor.map(_load_one, csv_files))
+            
+            # Streamlit 경고는 메인 스레드에서 출력
+            for csv_file, (file_key, df, error) in zip(csv_files, results):
+                if error is not None:
+                    st.warning(f"파일 로드 실패: {csv_file} - {str(error)}")
+                elif df is not None:
+                    self.dataframes[file_key] = df
             
             # 통합 데이터프레임 생성 (주요 분석용)
             self._create_unified_dataframe()
             
+            # 시각화 캐시 키로 사용할 데이터 지문
+            if getattr(self, 'main_df', None) is not None:
+                self._df_fingerprint = hash(
+                    pd.util.hash_pandas_object(self.main_df, index=True).values.tobytes()
+                )
+            
         except Exception as e:
             st.error(f"데이터 로드 중 오류 발생: {str(e)}")
     
+    def _read_csv_cached(self, file_path: str) -> pd.DataFrame:
+        """
+        CSV 파일 로드 - CSV 옆에 Parquet 캐시를 만들어 재사용
+        
+        Args:
+            file_path: CSV 파일 경로
+            
+        Returns:
+            로드된 데이터프레임
+        """
+        parquet_path = file_path + ".parquet"
+        
+        # CSV보다 최신인 캐시가 있으면 바로 읽기
+        if (os.path.exists(parquet_path)
+                and os.path.getmtime(parquet_path) >= os.path.getmtime(file_path)):
+            try:
+                return pd.read_parquet(parquet_path, engine="pyarrow")
+            except Exception:
+                pass  # 캐시가 손상된 경우 CSV에서 다시 로드
+        
+        df = self._parse_csv(file_path)
+        
+        # 다음 로드를 위해 Parquet 캐시 저장 (실패해도 계속 진행)
+        try:
+            df.to_parquet(parquet_path, engine="pyarrow", compression="snappy")
+        except Exception:
+            pass
+        
+        return df
+    
+    def _parse_csv(self, file_path: str) -> pd.DataFrame:
+        """PyArrow CSV 리더로 파싱 (pandas와 결과가 달라지는 파일은 pandas로 폴백)"""
+        convert_opts = pa_csv.ConvertOptions(strings_can_be_null=True)
+        
+        # 인코딩 시도 (euc-kr 우선, 실패시 utf-8)
+        for encoding in ('euc-kr', 'utf-8'):
+            read_opts = pa_csv.ReadOptions(encoding=encoding)
+            try:
+                table = pa_csv.read_csv(file_path, read_options=read_opts,
+                                        convert_options=convert_opts)
+            except UnicodeDecodeError:
+                continue
+            except pa.ArrowInvalid:
+                # 행마다 필드 수가 다른 파일 등은 pandas 파서로 처리
+                break
+            
+            # 중복 컬럼명은 pandas 방식(.1, .2 ...)으로 처리해야 하므로 폴백
+            if len(set(table.column_names)) != table.num_columns:
+                break
+            
+            return table.to_pandas(self_destruct=True)
+        
+        try:
+            return pd.read_csv(file_path, encoding='euc-kr')
+        except UnicodeDecodeError:
+            return pd.read_csv(file_path, encoding='utf-8')
+    
     def _preprocess_inventory_data(self, df: pd.DataFrame) -> pd.DataFrame:
         """국가 온실가스 인벤토리 데이터 전처리 (test.ipynb 방식)"""
         try:
@@ -108,13 +251,17 @@ class CarbonDataRAGAgent:
             df = df.reset_index()
             
             # 연도 컬럼을 숫자로 변환
-            df['연도'] = pd.to_numeric(df['연도'], errors='coerce')
+            df['연도'] = pd.to_numeric(df['연도'], errors='coerce', downcast='integer')
             
-            # 데이터 타입을 숫자로 변환
-            for col in df.columns[1:]:  # 첫 번째 컬럼(연도) 제외
-                df[col] = pd.to_numeric(df[col], errors='coerce')
+            # 데이터 타입을 숫자로 변환 - 첫 번째 컬럼(연도) 제외, 한 번에 float32로 변환
+            numeric_block = df.iloc[:, 1:].to_numpy(dtype=object)
+            values = pd.to_numeric(numeric_block.ravel(), errors='coerce')
+            values = values.reshape(numeric_block.shape).astype('float32')
             
-            return df
+            return pd.concat(
+                [df[['연도']], pd.DataFrame(values, index=df.index, columns=df.columns[1:])],
+                axis=1
+            )
             
         except Exception as e:
             st.warning(f"인벤토리 데이터 전처리 실패: {str(e)}")
@@ -134,41 +281,134 @@ class CarbonDataRAGAgent:
                     break
             
             if main_key:
-                self.unified_df = self.dataframes[main_key].copy()
+                self.unified_df = None
                 
-                # 다른 데이터프레임들과 연도 기준으로 merge
-                for key, df in self.dataframes.items():
-                    if key != main_key and '연도' in df.columns:
-                        # 연도 컬럼이 있는 경우 merge
-                        try:
-                            # 중복 컬럼명 처리
-                            df_to_merge = df.copy()
-                            overlap_cols = set(self.unified_df.columns) & set(df_to_merge.columns)
-                            overlap_cols.discard('연도')  # 연도 컬럼은 제외
-                            
-                            for col in overlap_cols:
-                                df_to_merge = df_to_merge.rename(columns={col: f"{col}_{key}"})
-                            
-                            self.unified_df = pd.merge(
-                                self.unified_df, 
-                                df_to_merge, 
-                                on='연도', 
-                                how='outer'
-                            )
-                        except Exception as e:
-                            st.warning(f"데이터 merge 실패: {key} - {str(e)}")
-                            continue
+                # Polars가 설치된 경우 LazyFrame 조인으로 한 번에 merge
+                has_merge_targets = any(key != main_key and '연도' in df.columns
+                                        for key, df in self.dataframes.items())
+                if pl is not None and has_merge_targets:
+                    try:
+                        self.unified_df = self._merge_with_polars(main_key)
+                    except Exception:
+                        self.unified_df = None  # pandas merge로 폴백
+                
+                if self.unified_df is None:
+                    self.unified_df = self._merge_with_pandas(main_key)
                 
+                self.unified_df = self._downcast(self.unified_df)
                 self.main_df = self.unified_df
             else:
                 # 첫 번째 데이터프레임을 메인으로 사용
-                self.main_df = list(self.dataframes.values())[0]
+                self.main_df = self._downcast(list(self.dataframes.values())[0])
                 
         except Exception as e:
             st.warning(f"통합 데이터프레임 생성 실패: {str(e)}")
             # 폴백: 첫 번째 데이터프레임 사용
             if self.dataframes:
                 self.main_df = list(self.dataframes.values())[0]
+        
+        # 연도별 조회용 인덱스 (차트에서 연도마다 전체 스캔하지 않도록)
+        if getattr(self, 'main_df', None) is not None and '연도' in self.main_df.columns:
+            self._by_year = self.main_df.set_index('연도', drop=False).sort_index()
+        
+        # 차트용 숫자형 컬럼 목록 (렌더링마다 dtype을 다시 검사하지 않도록)
+        if getattr(self, 'main_df', None) is not None:
+            self._numeric_cols = self._value_columns(self.main_df)
+    
+    @staticmethod
+    def _value_columns(df: pd.DataFrame) -> List[str]:
+        """연도를 제외한 숫자형 컬럼 목록"""
+        return [col for col in df.select_dtypes(include=[np.number]).columns if col != '연도']
+    
+    def _numeric_cols_for(self, df: pd.DataFrame) -> List[str]:
+        """차트 대상 숫자형 컬럼 (전체 데이터는 미리 계산한 목록 사용)"""
+        if df is self.main_df and self._numeric_cols is not None:
+            return self._numeric_cols
+        return self._value_columns(df)
+    
+    def _merge_with_polars(self, main_key: str) -> pd.DataFrame:
+        """Polars LazyFrame 조인으로 연도 기준 outer merge 수행"""
+        base = self.dataframes[main_key]
+        
+        # Polars는 문자열 컬럼명만 허용하므로 원래 컬럼명을 기억해 둠
+        original_names = {str(col): col for col in base.columns}
+        lazy = (pl.from_pandas(base.rename(columns=str)).lazy()
+                .with_columns(pl.col('연도').cast(pl.Int64, strict=False)))
+        
+        for key, df in self.dataframes.items():
+            if key == main_key or '연도' not in df.columns:
+                continue
+            
+            # 중복 컬럼명 처리 (rename도 쿼리 플랜에 포함됨)
+            df = df.rename(columns=str)
+            overlap_cols = (set(original_names) & set(df.columns)) - {'연도'}
+            renamed = {col: f"{col}_{key}" for col in overlap_cols}
+            for col in df.columns:
+                original_names.setdefault(col, col)
+            original_names.update({new: new for new in renamed.values()})
+            
+            other = (pl.from_pandas(df).lazy()
+                     .rename(renamed)
+                     .with_columns(pl.col('연도').cast(pl.Int64, strict=False)))
+            lazy = lazy.join(other, on='연도', how='full', coalesce=True)
+        
+        result = lazy.sort('연도', nulls_last=True).collect().to_pandas()
+        return result.rename(columns=original_names)
+    
+    def _merge_with_pandas(self, main_key: str) -> pd.DataFrame:
+        """pandas merge로 연도 기준 outer merge 수행"""
+        unified_df = self._with_int16_year(self.dataframes[main_key])
+        
+        # 다른 데이터프레임들과 연도 기준으로 merge
+        for key, df in self.dataframes.items():
+            if key != main_key and '연도' in df.columns:
+                # 연도 컬럼이 있는 경우 merge
+                try:
+                    # 중복 컬럼명 처리
+                    df_to_merge = self._with_int16_year(df)
+                    overlap_cols = (set(unified_df.columns) & set(df_to_merge.columns)) - {'연도'}
+                    if overlap_cols:
+                        df_to_merge = df_to_merge.rename(
+                            columns={col: f"{col}_{key}" for col in overlap_cols}
+                        )
+                    
+                    unified_df = pd.merge(
+                        unified_df, 
+                        df_to_merge, 
+                        on='연도', 
+                        how='outer',
+                        sort=False  # 매 merge마다 정렬하지 않고 마지막에 한 번만 정렬
+                    )
+                except Exception as e:
+                    st.warning(f"데이터 merge 실패: {key} - {str(e)}")
+                    continue
+        
+        return unified_df.sort_values('연도', ignore_index=True)
+    
+    @staticmethod
+    def _with_int16_year(df: pd.DataFrame) -> pd.DataFrame:
+        """merge 키인 연도 컬럼을 Int16으로 변환 (변환 불가 시 원본 반환)"""
+        try:
+            return df.astype({'연도': 'Int16'})
+        except (TypeError, ValueError):
+            return df
+    
+    def _downcast(self, df: pd.DataFrame) -> pd.DataFrame:
+        """숫자형 컬럼 다운캐스트 및 저카디널리티 문자열 컬럼의 카테고리 변환"""
+        df = df.copy(deep=False)
+        
+        for col in df.select_dtypes('float64').columns:
+            df[col] = pd.to_numeric(df[col], downcast='float')
+        for col in df.select_dtypes('integer').columns:
+            df[col] = pd.to_numeric(df[col], downcast='integer')
+        
+        # 고유값 비율이 낮은 문자열 컬럼은 카테고리형으로 변환
+        if len(df) > 0:
+            for col in df.select_dtypes(include=['object', 'string']).columns:
+                if df[col].nunique() / len(df) < 0.5:
+                    df[col] = df[col].astype(pd.CategoricalDtype())
+        
+        return df
     
     def create_visualization(self, query: str, data_subset: pd.DataFrame = None) -> Optional[str]:
         """
@@ -182,76 +422,113 @@ class CarbonDataRAGAgent:
             base64 인코딩된 이미지 문자열 또는 None
         """
         try:
+            # 그래프 타입 결정 (선 > 막대 > 파이 우선순위, 기본값은 선 그래프)
+            kinds = {_CHART_KEYWORDS[word] for word in _CHART_RE.findall(query)}
+            kind = next((k for k in ('line', 'bar', 'pie') if k in kinds), 'line')
+            
+            # 전체 데이터 시각화는 캐시 사용 (막대 그래프만 질문의 연도에 따라 달라짐)
+            if data_subset is None and self._df_fingerprint is not None:
+                if kind == 'bar':
+                    query_key = (kind, tuple(sorted({int(y) for y in _YEAR_RE.findall(query)})))
+                else:
+                    query_key = (kind,)
+                return _render_chart(self, query_key, self._df_fingerprint, kind, query)
+            
             if data_subset is None:
                 data_subset = self.main_df
             
-            # 그래프 타입 결정
-            if any(word in query.lower() for word in ['추이', '변화', '트렌드', '시간']):
-                return self._create_line_chart(data_subset, query)
-            elif any(word in query.lower() for word in ['비교', '차이', '대비']):
-                return self._create_bar_chart(data_subset, query)
-            elif any(word in query.lower() for word in ['분포', '비율']):
-                return self._create_pie_chart(data_subset, query)
-            else:
-                # 기본적으로 선 그래프 생성
-                return self._create_line_chart(data_subset, query)
+            return self._render(kind, data_subset, query)
                 
         except Exception as e:
             st.warning(f"시각화 생성 실패: {str(e)}")
             return None
     
+    def _render(self, kind: str, df: pd.DataFrame, query: str) -> Optional[str]:
+        """차트 종류에 맞는 생성 함수 호출 (공유 Figure를 쓰므로 동시 렌더링 방지)"""
+        with self._render_lock:
+            if kind == 'bar':
+                return self._create_bar_chart(df, query)
+            elif kind == 'pie':
+                return self._create_pie_chart(df, query)
+            return self._create_line_chart(df, query)
+    
+    def _rows_for_year(self, df: pd.DataFrame, year) -> pd.DataFrame:
+        """특정 연도의 행 조회 (전체 데이터는 미리 만든 연도 인덱스 사용)"""
+        if df is self.main_df and self._by_year is not None:
+            try:
+                return self._by_year.loc[[year]]
+            except KeyError:
+                return self._by_year.iloc[0:0]
+        return df[df['연도'] == year]
+    
+    @staticmethod
+    def _row_values(rows: pd.DataFrame, columns: List[str]) -> tuple:
+        """첫 번째 행에서 NaN이 아닌 값과 해당 컬럼명을 NumPy 한 번의 변환으로 추출"""
+        arr = rows[columns].to_numpy(dtype=np.float64)[0]
+        mask = ~np.isnan(arr)
+        return [col for col, keep in zip(columns, mask) if keep], arr[mask]
+    
+    def _prepare_axes(self, figsize: tuple):
+        """재사용하는 Figure의 크기를 맞추고 Axes를 비운 뒤 반환"""
+        self._fig.set_size_inches(*figsize)
+        self._ax.clear()
+        self._ax.set_aspect('auto')  # 파이 차트의 equal 비율 초기화
+        return self._ax
+    
+    def _encode_figure(self) -> str:
+        """현재 Figure를 WebP(quality=80)로 인코딩해 base64 문자열로 반환"""
+        self._canvas.draw()
+        image = Image.frombuffer('RGBA', self._canvas.get_width_height(),
+                                 self._canvas.buffer_rgba(), 'raw', 'RGBA', 0, 1)
+        img_buffer = io.BytesIO()
+        try:
+            image.save(img_buffer, format='WEBP', quality=80)
+        except (KeyError, OSError):
+            # WebP 미지원 Pillow 빌드에서는 PNG로 대체
+            img_buffer = io.BytesIO()
+            image.save(img_buffer, format='PNG')
+        return base64.b64encode(img_buffer.getbuffer()).decode('ascii')
+    
     def _create_line_chart(self, df: pd.DataFrame, query: str) -> Optional[str]:
         """선 그래프 생성"""
         try:
-            plt.figure(figsize=(12, 8))
+            ax = self._prepare_axes((12, 8))
             
             if '연도' in df.columns:
                 # 연도별 총배출량 추이
                 if '총배출량' in df.columns:
-                    plt.plot(df['연도'], df['총배출량'], marker='o', linewidth=2, markersize=8)
-                    plt.title('연도별 총배출량 변화 추이', fontsize=16, fontweight='bold')
-                    plt.ylabel('총배출량 (백만톤 CO2eq)', fontsize=12)
+                    ax.plot(df['연도'], df['총배출량'], marker='o', linewidth=2, markersize=8)
+                    ax.set_title('연도별 총배출량 변화 추이', fontsize=16, fontweight='bold')
+                    ax.set_ylabel('총배출량 (백만톤 CO2eq)', fontsize=12)
                 else:
                     # 숫자형 컬럼들 중 첫 번째 사용
-                    numeric_cols = df.select_dtypes(include=[np.number]).columns
-                    if len(numeric_cols) > 1:  # 연도 제외
-                        col_to_plot = [col for col in numeric_cols if col != '연도'][0]
-                        plt.plot(df['연도'], df[col_to_plot], marker='o', linewidth=2, markersize=8)
-                        plt.title(f'연도별 {col_to_plot} 변화 추이', fontsize=16, fontweight='bold')
-                        plt.ylabel(col_to_plot, fontsize=12)
+                    numeric_cols = self._numeric_cols_for(df)
+                    if numeric_cols:
+                        col_to_plot = numeric_cols[0]
+                        ax.plot(df['연도'], df[col_to_plot], marker='o', linewidth=2, markersize=8)
+                        ax.set_title(f'연도별 {col_to_plot} 변화 추이', fontsize=16, fontweight='bold')
+                        ax.set_ylabel(col_to_plot, fontsize=12)
                 
-                plt.xlabel('연도', fontsize=12)
-                plt.grid(True, alpha=0.3)
-                plt.xticks(rotation=45)
-            
-            plt.tight_layout()
-            
-            # 이미지를 base64로 인코딩
-            img_buffer = io.BytesIO()
-            plt.savefig(img_buffer, format='png', dpi=120, bbox_inches='tight')
-            img_buffer.seek(0)
-            img_base64 = base64.b64encode(img_buffer.getvalue()).decode()
-            plt.close()
+                ax.set_xlabel('연도', fontsize=12)
+                ax.grid(True, alpha=0.3)
+                ax.tick_params(axis='x', labelrotation=45)
             
-            return img_base64
+            return self._encode_figure()
             
         except Exception as e:
             st.warning(f"선 그래프 생성 실패: {str(e)}")
-            plt.close()
             return None
     
     def _create_bar_chart(self, df: pd.DataFrame, query: str) -> Optional[str]:
         """막대 그래프 생성 - 질문 내용을 분석하여 적절한 그래프 생성"""
         try:
-            plt.figure(figsize=(12, 8))
+            ax = self._prepare_axes((12, 8))
             
             if '연도' not in df.columns:
                 return None
             
             # 질문에서 연도 추출
-            import re
-            years_mentioned = re.findall(r'\b(19|20)\d{2}\b', query)
-            years_mentioned = [int(year) for year in years_mentioned]
+            years_mentioned = [int(year) for year in _YEAR_RE.findall(query)]
             
             # 총배출량 관련 컬럼 찾기
             total_cols = [col for col in df.columns if any(keyword in str(col).lower() 
@@ -262,124 +539,101 @@ class CarbonDataRAGAgent:
                 years_data = []
                 years_labels = []
                 
+                total_col = total_cols[0]  # 첫 번째 총배출량 컬럼 사용
                 for year in sorted(years_mentioned):
-                    year_data = df[df['연도'] == year]
-                    if not year_data.empty and total_cols:
-                        # 총배출량 컬럼 찾기
-                        total_col = total_cols[0]  # 첫 번째 총배출량 컬럼 사용
-                        value = year_data[total_col].iloc[0]
-                        if not pd.isna(value):
-                            years_data.append(value)
+                    year_data = self._rows_for_year(df, year)
+                    if not year_data.empty:
+                        _, value = self._row_values(year_data, [total_col])
+                        if len(value):
+                            years_data.append(value[0])
                             years_labels.append(f'{year}년')
                 
                 if years_data:
                     colors = ['#74b9ff', '#fd79a8', '#00b894', '#fdcb6e', '#e17055']
-                    plt.bar(years_labels, years_data, color=colors[:len(years_data)])
-                    plt.title('연도별 총배출량 비교', fontsize=16, fontweight='bold')
-                    plt.ylabel('총배출량 (Gg CO2eq)', fontsize=12)
+                    ax.bar(years_labels, years_data, color=colors[:len(years_data)])
+                    ax.set_title('연도별 총배출량 비교', fontsize=16, fontweight='bold')
+                    ax.set_ylabel('총배출량 (Gg CO2eq)', fontsize=12)
                     
                     # 값 표시
                     for i, v in enumerate(years_data):
-                        plt.text(i, v + max(years_data) * 0.01, f'{v:,.0f}', 
+                        ax.text(i, v + max(years_data) * 0.01, f'{v:,.0f}', 
                                 ha='center', va='bottom', fontsize=11, fontweight='bold')
                 else:
                     # 기본 막대 그래프 - 최신 연도 분야별 데이터
                     latest_year = df['연도'].max()
-                    latest_data = df[df['연도'] == latest_year]
+                    latest_data = self._rows_for_year(df, latest_year)
                     
-                    numeric_cols = latest_data.select_dtypes(include=[np.number]).columns
-                    numeric_cols = [col for col in numeric_cols if col != '연도'][:5]
+                    numeric_cols = self._numeric_cols_for(df)[:5]
                     
-                    values = [latest_data[col].iloc[0] for col in numeric_cols if not pd.isna(latest_data[col].iloc[0])]
-                    labels = [col for col in numeric_cols if not pd.isna(latest_data[col].iloc[0])]
+                    labels, values = self._row_values(latest_data, numeric_cols)
                     
-                    plt.bar(labels, values, color=plt.cm.Set3(np.linspace(0, 1, len(labels))))
-                    plt.title(f'{latest_year}년 주요 지표 비교', fontsize=16, fontweight='bold')
-                    plt.ylabel('값', fontsize=12)
-                    plt.xticks(rotation=45, ha='right')
+                    ax.bar(labels, values, color=plt.cm.Set3(np.linspace(0, 1, len(labels))))
+                    ax.set_title(f'{latest_year}년 주요 지표 비교', fontsize=16, fontweight='bold')
+                    ax.set_ylabel('값', fontsize=12)
+                    plt.setp(ax.get_xticklabels(), rotation=45, ha='right')
             
             elif years_mentioned and len(years_mentioned) == 1:
                 # 단일 연도의 분야별 데이터
                 year = years_mentioned[0]
-                year_data = df[df['연도'] == year]
+                year_data = self._rows_for_year(df, year)
                 
                 if not year_data.empty:
-                    numeric_cols = year_data.select_dtypes(include=[np.number]).columns
-                    numeric_cols = [col for col in numeric_cols if col != '연도'][:5]
+                    numeric_cols = self._numeric_cols_for(df)[:5]
                     
-                    values = [year_data[col].iloc[0] for col in numeric_cols if not pd.isna(year_data[col].iloc[0])]
-                    labels = [col for col in numeric_cols if not pd.isna(year_data[col].iloc[0])]
+                    labels, values = self._row_values(year_data, numeric_cols)
                     
-                    plt.bar(labels, values, color=plt.cm.Set3(np.linspace(0, 1, len(labels))))
-                    plt.title(f'{year}년 분야별 배출량', fontsize=16, fontweight='bold')
-                    plt.ylabel('배출량 (Gg CO2eq)', fontsize=12)
-                    plt.xticks(rotation=45, ha='right')
+                    ax.bar(labels, values, color=plt.cm.Set3(np.linspace(0, 1, len(labels))))
+                    ax.set_title(f'{year}년 분야별 배출량', fontsize=16, fontweight='bold')
+                    ax.set_ylabel('배출량 (Gg CO2eq)', fontsize=12)
+                    plt.setp(ax.get_xticklabels(), rotation=45, ha='right')
             else:
                 # 기본 막대 그래프 (최신 연도)
                 latest_year = df['연도'].max()
-                latest_data = df[df['연도'] == latest_year]
+                latest_data = self._rows_for_year(df, latest_year)
                 
-                numeric_cols = latest_data.select_dtypes(include=[np.number]).columns
-                numeric_cols = [col for col in numeric_cols if col != '연도'][:5]
+                numeric_cols = self._numeric_cols_for(df)[:5]
                 
-                values = [latest_data[col].iloc[0] for col in numeric_cols if not pd.isna(latest_data[col].iloc[0])]
-                labels = [col for col in numeric_cols if not pd.isna(latest_data[col].iloc[0])]
+                labels, values = self._row_values(latest_data, numeric_cols)
                 
-                plt.bar(labels, values, color=plt.cm.Set3(np.linspace(0, 1, len(labels))))
-                plt.title(f'{latest_year}년 주요 지표 비교', fontsize=16, fontweight='bold')
-                plt.ylabel('값', fontsize=12)
-                plt.xticks(rotation=45, ha='right')
+                ax.bar(labels, values, color=plt.cm.Set3(np.linspace(0, 1, len(labels))))
+                ax.set_title(f'{latest_year}년 주요 지표 비교', fontsize=16, fontweight='bold')
+                ax.set_ylabel('값', fontsize=12)
+                plt.setp(ax.get_xticklabels(), rotation=45, ha='right')
             
-            plt.tight_layout()
-            
-            # 이미지를 base64로 인코딩
-            img_buffer = io.BytesIO()
-            plt.savefig(img_buffer, format='png', dpi=120, bbox_inches='tight')
-            img_buffer.seek(0)
-            img_base64 = base64.b64encode(img_buffer.getvalue()).decode()
-            plt.close()
-            
-            return img_base64
+            return self._encode_figure()
             
         except Exception as e:
             st.warning(f"막대 그래프 생성 실패: {str(e)}")
-            plt.close()
             return None
     
     def _create_pie_chart(self, df: pd.DataFrame, query: str) -> Optional[str]:
         """파이 차트 생성"""
         try:
-            plt.figure(figsize=(8, 8))
+            ax = self._prepare_axes((8, 8))
             
             # 최근 연도 데이터 사용
             if '연도' in df.columns:
                 latest_year = df['연도'].max()
-                latest_data = df[df['연도'] == latest_year]
+                latest_data = self._rows_for_year(df, latest_year)
                 
                 # 숫자형 컬럼들 선택 (상위 5개)
-                numeric_cols = latest_data.select_dtypes(include=[np.number]).columns
-                numeric_cols = [col for col in numeric_cols if col != '연도'][:5]
+                numeric_cols = self._numeric_cols_for(df)[:5]
                 
-                values = [latest_data[col].iloc[0] for col in numeric_cols if not pd.isna(latest_data[col].iloc[0]) and latest_data[col].iloc[0] > 0]
-                labels = [col for col in numeric_cols if not pd.isna(latest_data[col].iloc[0]) and latest_data[col].iloc[0] > 0]
+                # 유한한 양수 값만 한 번의 벡터 마스크로 선택
+                row = latest_data[numeric_cols].to_numpy(dtype=np.float64)[0]
+                mask = np.isfinite(row) & (row > 0)
+                values = row[mask]
+                labels = [numeric_cols[i] for i in np.nonzero(mask)[0]]
                 
-                plt.pie(values, labels=labels, autopct='%1.1f%%', startangle=90)
-                plt.title(f'{latest_year}년 분야별 비율', fontsize=16, fontweight='bold')
+                ax.pie(values, labels=labels, autopct='%1.1f%%', startangle=90)
+                ax.set_title(f'{latest_year}년 분야별 비율', fontsize=16, fontweight='bold')
             
-            plt.axis('equal')
+            ax.axis('equal')
             
-            # 이미지를 base64로 인코딩
-            img_buffer = io.BytesIO()
-            plt.savefig(img_buffer, format='png', dpi=120, bbox_inches='tight')
-            img_buffer.seek(0)
-            img_base64 = base64.b64encode(img_buffer.getvalue()).decode()
-            plt.close()
-            
-            return img_base64
+            return self._encode_figure()
             
         except Exception as e:
             st.warning(f"파이 차트 생성 실패: {str(e)}")
-            plt.close()
             return None
     
     def _setup_agent(self) -> None:
@@ -395,15 +649,24 @@ class CarbonDataRAGAgent:
                 temperature=0
             )
             
-            # Pandas DataFrame Agent 생성
-            self.agent = create_pandas_dataframe_agent(
+            # Pandas DataFrame Agent 생성 (fireducks 설치 시 컴파일된 백엔드로 실행)
+            agent_kwargs = dict(
                 llm=llm,
-                df=self.main_df,
                 verbose=False,
                 agent_type=AgentType.ZERO_SHOT_REACT_DESCRIPTION,
                 allow_dangerous_code=True,
                 handle_parsing_errors=True
             )
+            self.agent = None
+            if fpd is not None:
+                try:
+                    self.agent = create_pandas_dataframe_agent(
+                        df=fpd.DataFrame(self.main_df), **agent_kwargs
+                    )
+                except Exception:
+                    self.agent = None  # 변환/검증 실패 시 pandas DataFrame 사용
+            if self.agent is None:
+                self.agent = create_pandas_dataframe_agent(df=self.main_df, **agent_kwargs)
             
         except Exception as e:
             st.error(f"에이전트 설정 중 오류 발생: {str(e)}")
@@ -421,6 +684,11 @@ class CarbonDataRAGAgent:
         if not self.agent:
             return "에이전트가 초기화되지 않았습니다. 데이터를 확인해주세요.", None
         
+        # 단순 조회 질문은 LLM을 거치지 않고 바로 답변
+        fast_answer = self._fast_answer(query)
+        if fast_answer is not None:
+            return fast_answer, None
+        
         try:
             # 일반적인 invoke 방식 사용
             response = self.agent.invoke({"input": query})
@@ -467,6 +735,33 @@ class CarbonDataRAGAgent:
             
             return f"질문 처리 중 오류가 발생했습니다: {error_msg[:200]}...", None
     
+    def _fast_answer(self, query: str) -> Optional[str]:
+        """패턴이 일치하는 단순 조회 질문이면 직접 답변, 아니면 None"""
+        for pattern, handler in _FASTPATH:
+            if pattern.search(query):
+                try:
+                    return getattr(self, handler)(query)
+                except Exception:
+                    return None  # 조회 실패 시 LLM 에이전트로 넘김
+        return None
+    
+    def _answer_row_count(self, query: str) -> Optional[str]:
+        """메인 데이터 행 수 답변"""
+        return f"데이터에는 총 {self.main_df.shape[0]:,}개의 행이 있습니다."
+    
+    def _answer_total_emission(self, query: str) -> Optional[str]:
+        """특정 연도의 총배출량 답변"""
+        if self._by_year is None or '총배출량' not in self._by_year.columns:
+            return None
+        year = int(_YEAR_RE.search(query).group())
+        try:
+            values = self._by_year.loc[[year], '총배출량'].dropna()
+        except KeyError:
+            return None
+        if values.empty:
+            return None
+        return f"{year}년의 총배출량은 {values.iloc[0]:,.1f}입니다."
+    
     def get_data_summary(self) -> Dict[str, Any]:
         """로드된 데이터의 요약 정보 반환"""
         summary = {
@@ -497,18 +792,22 @@ class CarbonDataRAGAgent:
 
 # 전역 에이전트 인스턴스 (싱글톤 패턴)
 _agent_instance = None
+_agent_lock = threading.Lock()
 
 def get_carbon_agent() -> CarbonDataRAGAgent:
-    """탄소 데이터 RAG 에이전트 인스턴스 반환 (싱글톤)"""
+    """탄소 데이터 RAG 에이전트 인스턴스 반환 (싱글톤, 세션 간 중복 생성 방지)"""
     global _agent_instance
     if _agent_instance is None:
-        _agent_instance = CarbonDataRAGAgent()
+        with _agent_lock:
+            if _agent_instance is None:
+                _agent_instance = CarbonDataRAGAgent()
     return _agent_instance
 
 def initialize_agent() -> CarbonDataRAGAgent:
-    """에이전트 강제 재초기화"""
+    """에이전트 강제 재초기화 (변경되지 않은 파일은 캐시 재사용)"""
     global _agent_instance
-    _agent_instance = CarbonDataRAGAgent()
+    with _agent_lock:
+        _agent_instance = CarbonDataRAGAgent()
     return _agent_instance
 
 # 테스트 함수
@@ -538,4 +837,4 @@ if __name__ == "__main__":
         print(f"답변: {answer}")
         
         if visualization:
-            st.image(f"data:image/png;base64,{visualization}") 
\ No newline at end of file
+            st.image(f"data:image/webp;base64,{visualization}") 
\ No newline at end of file
@@ -4,6 +4,7 @@
 """
 
 import ast
+import builtins
 import sys
 import io
 import contextlib
@@ -11,15 +12,168 @@ import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Dict, List, Any, Optional, Tuple, Sequence
 import warnings
 import traceback
 from datetime import datetime
 import re
+import threading
+from collections import deque
+from functools import lru_cache
+
+# 질문 속 연도(1990~2030) 추출용 정규식 - '2017년'처럼 한글이 바로 붙어도 매칭
+_YEAR_RE = re.compile(r'(?<!\d)(?:199\d|20[0-2]\d|2030)(?!\d)')
+
+# redirect_stdout은 프로세스 전역 sys.stdout을 바꾸므로 동시 실행 시 직렬화
+_EXEC_LOCK = threading.Lock()
+
+# 코드 생성 템플릿 (분기마다 문자열 한 번만 생성)
+_QUERY_HEADER_TPL = """# 질문: {query}
+# 생성된 코드
+
+{filter_line}
+"""
+
+_YEARLY_COMPARE_TPL = """
+# 연도별 총합 계산
+yearly_totals = filtered_data.groupby('year')['value'].{agg}().reset_index()
+result = yearly_totals
+print('연도별 총합:')
+print(result)"""
+
+_DATASET_COMPARE_TPL = """
+# 데이터셋별 총합 계산
+dataset_totals = filtered_data.groupby('dataset')['value'].{agg}().reset_index()
+result = dataset_totals.sort_values('value', ascending=False)
+print('데이터셋별 총합:')
+print(result)"""
+
+_TREND_TPL = """
+# 연도별 추세 계산
+trend_data = filtered_data.groupby('year')['value'].{agg}().reset_index()
+trend_data = trend_data.sort_values('year')
+result = trend_data
+print('연도별 추세:')
+print(result)"""
+
+_RANKING_TPL = """
+# 순위 계산
+ranking_data = filtered_data.groupby('dataset')['value'].{agg}().reset_index()
+ranking_data = ranking_data.sort_values('value', ascending={ascending})
+result = ranking_data
+print('순위별 데이터:')
+print(result)"""
+
+_SUMMARY_TPL = """
+# 데이터 요약
+summary = filtered_data.groupby(['year', 'dataset'])['value'].{agg}().reset_index()
+result = summary
+print('데이터 요약:')
+print(result.head(10))"""
+
+_ANALYSIS_HEADER_TPL = """# 자동 생성된 분석 코드
+# 질문 타입: {query_type}
+
+{filter_line}
+"""
+
+_ANALYSIS_TPLS = {
+    'comparison': """
+# 비교 분석
+comparison_result = filtered_data.groupby('year')['value'].{agg}().reset_index()
+result = comparison_result
+print('비교 결과:')
+print(result)""",
+    'trend': """
+# 추세 분석
+trend_result = filtered_data.groupby('year')['value'].sum().reset_index()
+trend_result = trend_result.sort_values('year')
+result = trend_result
+print('추세 분석 결과:')
+print(result)""",
+    'ranking': """
+# 순위 분석
+ranking_result = filtered_data.groupby('dataset')['value'].sum().reset_index()
+ranking_result = ranking_result.sort_values('value', ascending=False)
+result = ranking_result
+print('순위 분석 결과:')
+print(result)""",
+}
+
+_ANALYSIS_BASIC_TPL = """
+# 기본 분석
+basic_result = filtered_data.groupby(['year', 'dataset'])['value'].sum().reset_index()
+result = basic_result
+print('분석 결과:')
+print(result.head(10))"""
+
+
+@lru_cache(maxsize=256)
+def _parse_code(code: str) -> ast.Module:
+    """코드 AST 파싱 (같은 코드 문자열은 재파싱하지 않음)"""
+    return ast.parse(code)
+
+
+class _CodeScan(ast.NodeVisitor):
+    """금지 구문 검사와 변수/함수 수집을 한 번의 AST 순회로 처리"""
+    
+    def __init__(self, forbidden: frozenset):
+        self.forbidden = forbidden
+        self.error: Optional[str] = None
+        self.variables = set()
+        self.functions = set()
+    
+    def _fail(self, message: str):
+        if self.error is None:
+            self.error = message
+    
+    def visit_Name(self, node: ast.Name):
+        self.variables.add(node.id)
+        if node.id in self.forbidden:
+            self._fail(f"금지된 키워드 사용: {node.id}")
+    
+    def visit_Import(self, node):
+        self._fail("import 문은 허용되지 않습니다")
+    
+    visit_ImportFrom = visit_Import
+    
+    def visit_Call(self, node: ast.Call):
+        if isinstance(node.func, ast.Name):
+            self.functions.add(node.func.id)
+            if node.func.id in self.forbidden:
+                self._fail(f"금지된 함수 호출: {node.func.id}")
+        self.generic_visit(node)
+
+
+@lru_cache(maxsize=256)
+def _scan_code(code: str, forbidden: frozenset) -> Tuple[Optional[str], frozenset, frozenset]:
+    """코드 검사 결과 (오류 메시지, 변수, 함수) - 같은 코드는 재순회하지 않음"""
+    scan = _CodeScan(forbidden)
+    scan.visit(_parse_code(code))
+    return scan.error, frozenset(scan.variables), frozenset(scan.functions)
+
+
+@lru_cache(maxsize=256)
+def _compile_code(code: str):
+    """실행용 코드 객체 컴파일 (템플릿으로 생성된 반복 코드 재사용)"""
+    return compile(code, '<generated>', 'exec')
+
 
 class SafeCodeExecutor:
     """안전한 코드 실행 클래스"""
     
+    # 질문 의도별 키워드 (한국어는 조사가 붙으므로 토큰이 아닌 부분 문자열로 한 번에 매칭)
+    _AGG_KEYWORDS = (
+        ('sum', re.compile('총|합계|전체')),
+        ('mean', re.compile('평균')),
+        ('max', re.compile('최대|최고')),
+        ('min', re.compile('최소|최저')),
+    )
+    _COMPARE_RE = re.compile('비교|차이|대비')
+    _TREND_RE = re.compile('추이|변화|트렌드|경향')
+    _RANKING_RE = re.compile('순위|많은|적은|높은|낮은')
+    _ASCENDING_RE = re.compile('적은|낮은|최소')
+    
     def __init__(self):
         """코드 실행기 초기화"""
         # 허용된 모듈과 함수들
@@ -37,6 +191,10 @@ class SafeCodeExecutor:
             'list', 'dict', 'tuple', 'set', 'range', 'enumerate', 'zip',
             'sorted', 'reversed', 'any', 'all', 'print'
         }
+        # 실행마다 조회하지 않도록 허용된 내장 함수 객체를 미리 수집
+        self._allowed_builtin_dict = {
+            name: getattr(builtins, name) for name in self.allowed_builtins if hasattr(builtins, name)
+        }
         
         # 금지된 키워드와 함수들
         self.forbidden_keywords = {
@@ -45,8 +203,11 @@ class SafeCodeExecutor:
             'dir', 'hasattr', 'getattr', 'setattr', 'delattr', '__builtins__'
         }
         
-        # 코드 실행 히스토리
-        self.execution_history: List[Dict[str, Any]] = []
+        # 코드 실행 히스토리 (최대 100개, 오래된 항목부터 자동 삭제)
+        self.execution_history: deque = deque(maxlen=100)
+        
+        # 마지막 실행 예외 (traceback은 필요할 때만 포맷)
+        self._last_exc: Optional[BaseException] = None
         
     def generate_code_from_query(self, query: str, data_info: Dict[str, Any]) -> str:
         """질문을 바탕으로 pandas 코드 생성"""
@@ -55,128 +216,54 @@ class SafeCodeExecutor:
         # 기본 데이터프레임 이름
         df_name = "unified_data"
         
-        code_lines = [
-            f"# 질문: {query}",
-            f"# 생성된 코드",
-            ""
-        ]
-        
         # 연도 필터링
         years = self._extract_years(query)
         if years:
             if len(years) == 1:
-                code_lines.append(f"filtered_data = {df_name}[{df_name}['year'] == {years[0]}]")
+                filter_line = f"filtered_data = {df_name}[{df_name}['year'] == {years[0]}]"
             else:
-                year_list = str(years)
-                code_lines.append(f"filtered_data = {df_name}[{df_name}['year'].isin({year_list})]")
+                filter_line = f"filtered_data = {df_name}[{df_name}['year'].isin({years})]"
         else:
-            code_lines.append(f"filtered_data = {df_name}.copy()")
+            filter_line = f"filtered_data = {df_name}"
         
-        # 집계 타입 결정
-        if any(word in query_lower for word in ['총', '합계', '전체']):
-            aggregation = 'sum'
-        elif any(word in query_lower for word in ['평균']):
-            aggregation = 'mean'
-        elif any(word in query_lower for word in ['최대', '최고']):
-            aggregation = 'max'
-        elif any(word in query_lower for word in ['최소', '최저']):
-            aggregation = 'min'
-        else:
-            aggregation = 'sum'
+        # 집계 타입 결정 (기본값은 합계)
+        aggregation = next(
+            (agg for agg, pattern in self._AGG_KEYWORDS if pattern.search(query_lower)), 'sum'
+        )
         
         # 비교 질문인지 확인
-        if any(word in query_lower for word in ['비교', '차이', '대비']):
+        if self._COMPARE_RE.search(query_lower):
             if years and len(years) >= 2:
-                code_lines.extend([
-                    "",
-                    "# 연도별 총합 계산",
-                    f"yearly_totals = filtered_data.groupby('year')['value'].{aggregation}().reset_index()",
-                    "result = yearly_totals",
-                    "print('연도별 총합:')",
-                    "print(result)"
-                ])
+                body = _YEARLY_COMPARE_TPL.format(agg=aggregation)
             else:
-                code_lines.extend([
-                    "",
-                    "# 데이터셋별 총합 계산", 
-                    f"dataset_totals = filtered_data.groupby('dataset')['value'].{aggregation}().reset_index()",
-                    "result = dataset_totals.sort_values('value', ascending=False)",
-                    "print('데이터셋별 총합:')",
-                    "print(result)"
-                ])
+                body = _DATASET_COMPARE_TPL.format(agg=aggregation)
         
         # 추세 질문인지 확인
-        elif any(word in query_lower for word in ['추이', '변화', '트렌드', '경향']):
-            code_lines.extend([
-                "",
-                "# 연도별 추세 계산",
-                f"trend_data = filtered_data.groupby('year')['value'].{aggregation}().reset_index()",
-                "trend_data = trend_data.sort_values('year')",
-                "result = trend_data",
-                "print('연도별 추세:')",
-                "print(result)"
-            ])
+        elif self._TREND_RE.search(query_lower):
+            body = _TREND_TPL.format(agg=aggregation)
         
         # 순위 질문인지 확인
-        elif any(word in query_lower for word in ['순위', '많은', '적은', '높은', '낮은']):
-            ascending = any(word in query_lower for word in ['적은', '낮은', '최소'])
-            code_lines.extend([
-                "",
-                "# 순위 계산",
-                f"ranking_data = filtered_data.groupby('dataset')['value'].{aggregation}().reset_index()",
-                f"ranking_data = ranking_data.sort_values('value', ascending={ascending})",
-                "result = ranking_data",
-                "print('순위별 데이터:')",
-                "print(result)"
-            ])
+        elif self._RANKING_RE.search(query_lower):
+            ascending = bool(self._ASCENDING_RE.search(query_lower))
+            body = _RANKING_TPL.format(agg=aggregation, ascending=ascending)
         
         # 특정 값 조회
         else:
-            code_lines.extend([
-                "",
-                "# 데이터 요약",
-                f"summary = filtered_data.groupby(['year', 'dataset'])['value'].{aggregation}().reset_index()",
-                "result = summary",
-                "print('데이터 요약:')",
-                "print(result.head(10))"
-            ])
+            body = _SUMMARY_TPL.format(agg=aggregation)
         
-        return "\n".join(code_lines)
+        return _QUERY_HEADER_TPL.format(query=query, filter_line=filter_line) + body
     
     def _extract_years(self, query: str) -> List[int]:
-        """질문에서 연도 추출"""
-        years = []
-        year_pattern = r'(\d{4})'
-        matches = re.findall(year_pattern, query)
-        
-        for match in matches:
-            year = int(match)
-            if 1990 <= year <= 2030:
-                years.append(year)
-        
-        return sorted(list(set(years)))
+        """질문에서 연도 추출 (범위 검사는 정규식에서 처리)"""
+        return sorted({int(match) for match in _YEAR_RE.findall(query)})
     
     def validate_code(self, code: str) -> Tuple[bool, str]:
         """코드 안전성 검증"""
         try:
-            # AST 파싱으로 구문 오류 확인
-            tree = ast.parse(code)
-            
-            # 금지된 키워드 확인
-            for node in ast.walk(tree):
-                if isinstance(node, ast.Name):
-                    if node.id in self.forbidden_keywords:
-                        return False, f"금지된 키워드 사용: {node.id}"
-                
-                # import 문 확인
-                elif isinstance(node, (ast.Import, ast.ImportFrom)):
-                    return False, "import 문은 허용되지 않습니다"
-                
-                # 함수 호출 확인
-                elif isinstance(node, ast.Call):
-                    if isinstance(node.func, ast.Name):
-                        if node.func.id in self.forbidden_keywords:
-                            return False, f"금지된 함수 호출: {node.func.id}"
+            # AST 파싱 및 금지 구문 검사 (한 번의 순회)
+            error, _, _ = _scan_code(code, frozenset(self.forbidden_keywords))
+            if error:
+                return False, error
             
             return True, "코드가 안전합니다"
             
@@ -196,6 +283,9 @@ class SafeCodeExecutor:
         Returns:
             (성공여부, 결과, 출력/오류메시지)
         """
+        # 이전 실행의 예외가 이번 실행의 traceback으로 보이지 않도록 초기화
+        self._last_exc = None
+        
         # 코드 검증
         is_safe, message = self.validate_code(code)
         if not is_safe:
@@ -208,12 +298,12 @@ class SafeCodeExecutor:
         output_buffer = io.StringIO()
         
         try:
-            with contextlib.redirect_stdout(output_buffer):
+            with _EXEC_LOCK, contextlib.redirect_stdout(output_buffer):
                 with warnings.catch_warnings():
                     warnings.simplefilter("ignore")
                     
                     # 코드 실행
-                    exec(code, {"__builtins__": {}}, exec_context)
+                    exec(_compile_code(code), {"__builtins__": {}}, exec_context)
             
             # 결과 추출
             result = exec_context.get('result', None)
@@ -225,29 +315,27 @@ class SafeCodeExecutor:
             return True, result, output
             
         except Exception as e:
-            error_msg = f"실행 오류: {str(e)}\n{traceback.format_exc()}"
+            self._last_exc = e
+            error_msg = f"실행 오류: {str(e)}"
             self._save_execution_history(code, None, error_msg, False)
             return False, None, error_msg
         
         finally:
             output_buffer.close()
     
+    @property
+    def last_traceback(self) -> Optional[str]:
+        """마지막 실행 실패의 traceback 문자열 (요청 시에만 생성)"""
+        if self._last_exc is None:
+            return None
+        return "".join(traceback.format_exception(
+            type(self._last_exc), self._last_exc, self._last_exc.__traceback__
+        ))
+    
     def _prepare_context(self, context: Dict[str, Any]) -> Dict[str, Any]:
         """실행 컨텍스트 준비"""
-        exec_context = {}
-        
-        # 허용된 모듈들 추가
-        exec_context.update(self.allowed_modules)
-        
-        # 허용된 내장 함수들 추가
-        for builtin_name in self.allowed_builtins:
-            if hasattr(__builtins__, builtin_name):
-                exec_context[builtin_name] = getattr(__builtins__, builtin_name)
-        
-        # 사용자 제공 컨텍스트 추가
-        exec_context.update(context)
-        
-        return exec_context
+        # 허용된 모듈 + 허용된 내장 함수 + 사용자 제공 컨텍스트
+        return {**self.allowed_modules, **self._allowed_builtin_dict, **context}
     
     def _save_execution_history(self, code: str, result: Any, output: str, success: bool):
         """실행 히스토리 저장"""
@@ -260,70 +348,21 @@ class SafeCodeExecutor:
         }
         
         self.execution_history.append(history_entry)
-        
-        # 히스토리 크기 제한 (최대 100개)
-        if len(self.execution_history) > 100:
-            self.execution_history = self.execution_history[-100:]
     
-    def generate_analysis_code(self, query_intent: Any, data_columns: List[str]) -> str:
-        """질문 의도를 바탕으로 분석 코드 생성"""
-        code_lines = [
-            "# 자동 생성된 분석 코드",
-            f"# 질문 타입: {query_intent.query_type.value}",
-            ""
-        ]
+    def generate_analysis_code(self, query_intent: Any, data_columns: Sequence[str]) -> str:
+        """질문 의도를 바탕으로 분석 코드 생성 (data_columns는 읽기 전용 - tuple 전달 가능)"""
+        query_type = query_intent.query_type.value
         
         # 기본 필터링
         if query_intent.years:
-            year_filter = f"unified_data['year'].isin({query_intent.years})"
-            code_lines.append(f"filtered_data = unified_data[{year_filter}]")
+            filter_line = f"filtered_data = unified_data[unified_data['year'].isin({query_intent.years})]"
         else:
-            code_lines.append("filtered_data = unified_data.copy()")
+            filter_line = "filtered_data = unified_data"
         
         # 질문 타입별 분석 코드
-        if query_intent.query_type.value == 'comparison':
-            code_lines.extend([
-                "",
-                "# 비교 분석",
-                f"comparison_result = filtered_data.groupby('year')['value'].{query_intent.aggregation}().reset_index()",
-                "result = comparison_result",
-                "print('비교 결과:')",
-                "print(result)"
-            ])
+        body = _ANALYSIS_TPLS.get(query_type, _ANALYSIS_BASIC_TPL).format(agg=query_intent.aggregation)
         
-        elif query_intent.query_type.value == 'trend':
-            code_lines.extend([
-                "",
-                "# 추세 분석",
-                "trend_result = filtered_data.groupby('year')['value'].sum().reset_index()",
-                "trend_result = trend_result.sort_values('year')",
-                "result = trend_result",
-                "print('추세 분석 결과:')",
-                "print(result)"
-            ])
-        
-        elif query_intent.query_type.value == 'ranking':
-            code_lines.extend([
-                "",
-                "# 순위 분석",
-                "ranking_result = filtered_data.groupby('dataset')['value'].sum().reset_index()",
-                "ranking_result = ranking_result.sort_values('value', ascending=False)",
-                "result = ranking_result",
-                "print('순위 분석 결과:')",
-                "print(result)"
-            ])
-        
-        else:
-            code_lines.extend([
-                "",
-                "# 기본 분석",
-                "basic_result = filtered_data.groupby(['year', 'dataset'])['value'].sum().reset_index()",
-                "result = basic_result",
-                "print('분석 결과:')",
-                "print(result.head(10))"
-            ])
-        
-        return "\n".join(code_lines)
+        return _ANALYSIS_HEADER_TPL.format(query_type=query_type, filter_line=filter_line) + body
     
     def get_execution_summary(self) -> Dict[str, Any]:
         """실행 요약 정보 반환"""
@@ -334,7 +373,7 @@ class SafeCodeExecutor:
         successful = sum(1 for entry in self.execution_history if entry['success'])
         success_rate = successful / total if total > 0 else 0
         
-        recent = self.execution_history[-5:]  # 최근 5개
+        recent = list(self.execution_history)[-5:]  # 최근 5개
         
         return {
             "total_executions": total,
@@ -344,24 +383,15 @@ class SafeCodeExecutor:
     
     def clear_history(self):
         """실행 히스토리 초기화"""
-        self.execution_history = []
+        self.execution_history.clear()
     
     def debug_code(self, code: str) -> List[str]:
         """코드 디버깅 정보 제공"""
         debug_info = []
         
         try:
-            tree = ast.parse(code)
-            
-            # 변수 사용 분석
-            variables = set()
-            functions = set()
-            
-            for node in ast.walk(tree):
-                if isinstance(node, ast.Name):
-                    variables.add(node.id)
-                elif isinstance(node, ast.Call) and isinstance(node.func, ast.Name):
-                    functions.add(node.func.id)
+            # 변수 사용 분석 (validate_code와 같은 검사 결과 재사용)
+            _, variables, functions = _scan_code(code, frozenset(self.forbidden_keywords))
             
             debug_info.append(f"사용된 변수: {', '.join(sorted(variables))}")
             debug_info.append(f"호출된 함수: {', '.join(sorted(functions))}")
@@ -7,10 +7,37 @@ import pandas as pd
 import numpy as np
 import os
 import re
+import codecs
+import pickle
+import hashlib
 from typing import Dict, List, Tuple, Any, Optional
 from dataclasses import dataclass
 import logging
 from pathlib import Path
+from pandas.api.types import union_categoricals
+from datetime import date, time
+
+
+def _iqr_outlier_flags(values: np.ndarray) -> np.ndarray:
+    """IQR(1.5배) 기준 이상치 플래그 - 부분 정렬로 분위수를 구한 뒤 벡터 비교"""
+    n = values.size
+    if n == 0:
+        return np.zeros(0, dtype=np.bool_)
+    
+    # pandas quantile과 같은 선형 보간 위치
+    pos1 = (n - 1) * 0.25
+    pos3 = (n - 1) * 0.75
+    lo1, lo3 = int(np.floor(pos1)), int(np.floor(pos3))
+    hi1, hi3 = min(lo1 + 1, n - 1), min(lo3 + 1, n - 1)
+    part = np.partition(values, [lo1, hi1, lo3, hi3])
+    q1 = part[lo1] + (part[hi1] - part[lo1]) * (pos1 - lo1)
+    q3 = part[lo3] + (part[hi3] - part[lo3]) * (pos3 - lo3)
+    
+    iqr = q3 - q1
+    lower_bound = q1 - 1.5 * iqr
+    upper_bound = q3 + 1.5 * iqr
+    return (values < lower_bound) | (values > upper_bound)
+
 
 @dataclass
 class DatasetInfo:
@@ -42,36 +69,94 @@ class DataPreprocessor:
         self.unified_data: Optional[pd.DataFrame] = None
         self.metadata: Dict[str, Any] = {}
         
+        # 전처리 결과 캐시 (파일명 -> ((mtime_ns, size), DatasetInfo), 데이터는 Parquet)
+        self._cache_dir = self.data_folder / '.preproc_cache'
+        self._cache_index_path = self._cache_dir / 'index.pkl'
+        
         # 로깅 설정
         logging.basicConfig(level=logging.INFO)
         self.logger = logging.getLogger(__name__)
         
     def analyze_all_datasets(self) -> Dict[str, DatasetInfo]:
-        """모든 CSV 파일을 분석하여 스키마 정보 추출"""
+        """모든 CSV 파일을 분석하여 스키마 정보 추출 (변경되지 않은 파일은 캐시 사용)"""
         csv_files = list(self.data_folder.glob("*.csv"))
+        cache_index = self._load_cache_index()
+        cache_updated = False
         
         for csv_file in csv_files:
             try:
-                # 다양한 인코딩으로 시도
-                df = self._load_csv_with_encoding(csv_file)
-                if df is not None:
+                stat = csv_file.stat()
+                cache_key = (stat.st_mtime_ns, stat.st_size)
+                
+                cached = self._load_cached_dataset(csv_file, cache_key, cache_index)
+                if cached is not None:
+                    df, info = cached
+                else:
+                    # 다양한 인코딩으로 시도
+                    df = self._load_csv_with_encoding(csv_file)
+                    if df is None:
+                        continue
                     info = self._analyze_dataset(df, csv_file.name)
-                    self.datasets[csv_file.stem] = df
-                    self.dataset_info[csv_file.stem] = info
-                    self.logger.info(f"분석 완료: {csv_file.name}")
+                    cache_updated |= self._store_cached_dataset(csv_file, cache_key, df, info, cache_index)
+                
+                self.datasets[csv_file.stem] = df
+                self.dataset_info[csv_file.stem] = info
+                self.logger.info(f"분석 완료: {csv_file.name}")
                     
             except Exception as e:
                 self.logger.error(f"파일 분석 실패 {csv_file.name}: {e}")
+        
+        if cache_updated:
+            self._save_cache_index(cache_index)
                 
         return self.dataset_info
     
+    def _load_cache_index(self) -> Dict[str, Tuple[Tuple[int, int], DatasetInfo]]:
+        """전처리 캐시 인덱스 로드 (없거나 손상된 경우 빈 인덱스)"""
+        try:
+            with open(self._cache_index_path, 'rb') as f:
+                return pickle.load(f)
+        except Exception:
+            return {}
+    
+    def _save_cache_index(self, cache_index: Dict[str, Tuple[Tuple[int, int], DatasetInfo]]):
+        """전처리 캐시 인덱스 저장"""
+        try:
+            with open(self._cache_index_path, 'wb') as f:
+                pickle.dump(cache_index, f)
+        except Exception as e:
+            self.logger.warning(f"전처리 캐시 인덱스 저장 실패: {e}")
+    
+    def _load_cached_dataset(self, csv_file: Path, cache_key: Tuple[int, int],
+                             cache_index: Dict) -> Optional[Tuple[pd.DataFrame, DatasetInfo]]:
+        """파일이 바뀌지 않았으면 Parquet 캐시에서 데이터와 분석 결과 로드"""
+        entry = cache_index.get(csv_file.name)
+        if entry is None or entry[0] != cache_key:
+            return None
+        try:
+            df = pd.read_parquet(self._cache_dir / f"{csv_file.stem}.parquet", engine='pyarrow')
+        except Exception:
+            return None
+        return df, entry[1]
+    
+    def _store_cached_dataset(self, csv_file: Path, cache_key: Tuple[int, int],
+                              df: pd.DataFrame, info: DatasetInfo, cache_index: Dict) -> bool:
+        """전처리 결과를 Parquet 캐시로 저장 (Parquet으로 표현할 수 없는 데이터는 캐시하지 않음)"""
+        try:
+            self._cache_dir.mkdir(exist_ok=True)
+            df.to_parquet(self._cache_dir / f"{csv_file.stem}.parquet", engine='pyarrow')
+        except Exception:
+            return False
+        cache_index[csv_file.name] = (cache_key, info)
+        return True
+    
     def _load_csv_with_encoding(self, filepath: Path) -> Optional[pd.DataFrame]:
         """다양한 인코딩으로 CSV 파일 로드 시도"""
         encodings = ['utf-8', 'euc-kr', 'cp949', 'latin1']
         
-        for encoding in encodings:
+        for encoding in self._candidate_encodings(filepath, encodings):
             try:
-                df = pd.read_csv(filepath, encoding=encoding)
+                df = self._read_csv(filepath, encoding)
                 
                 # 국가 온실가스 인벤토리 파일의 경우 특별 처리
                 if '국가 온실가스 인벤토리' in filepath.name:
@@ -80,17 +165,19 @@ class DataPreprocessor:
                     print(f"   - 첫 번째 컬럼: {df.columns[0]}")
                     print(f"   - 두 번째 컬럼: {df.columns[1] if len(df.columns) > 1 else 'N/A'}")
                     
-                    # 2017년과 2021년 데이터 확인
-                    if len(df.columns) > 1:
-                        row_2017 = df[df.iloc[:, 0] == 2017]
-                        row_2021 = df[df.iloc[:, 0] == 2021]
-                        if not row_2017.empty:
-                            print(f"   - 2017년 총배출량: {row_2017.iloc[0, 1]} (백만톤 CO₂)")
-                        if not row_2021.empty:
-                            print(f"   - 2021년 총배출량: {row_2021.iloc[0, 1]} (백만톤 CO₂)")
+                    # 2017년과 2021년 데이터 확인 (디버그 로그에서만, 한 번의 스캔)
+                    if len(df.columns) > 1 and self.logger.isEnabledFor(logging.DEBUG):
+                        probe = df[df.iloc[:, 0].isin([2017, 2021])]
+                        for year, total in zip(probe.iloc[:, 0], probe.iloc[:, 1]):
+                            self.logger.debug(f"   - {year}년 총배출량: {total} (백만톤 CO₂)")
                     
                     # 데이터가 이미 올바른 형태인지 확인 (연도가 첫 번째 컬럼에 있는 경우)
-                    if df.iloc[:, 0].dtype in ['int64', 'float64'] or any(str(val).isdigit() and 1990 <= int(str(val)) <= 2030 for val in df.iloc[:, 0].dropna() if str(val).replace('.', '').isdigit()):
+                    first_col = df.iloc[:, 0]
+                    looks_like_year = (
+                        first_col.dtype in ['int64', 'float64'] or
+                        pd.to_numeric(first_col, errors='coerce').between(1990, 2030).any()
+                    )
+                    if looks_like_year:
                         print("   - 데이터가 이미 올바른 형태 (연도가 첫 번째 컬럼)")
                         # 컬럼명 정리
                         if len(df.columns) > 1:
@@ -112,6 +199,56 @@ class DataPreprocessor:
                 
         return None
     
+    def _read_csv(self, filepath: Path, encoding: str) -> pd.DataFrame:
+        """pyarrow 멀티스레드 파서로 CSV 로드 (행 길이 불일치 등 실패 시 기본 엔진)"""
+        try:
+            df = pd.read_csv(filepath, encoding=encoding, engine='pyarrow')
+            # pyarrow는 중복 컬럼명을 그대로 두고 날짜 문자열을 날짜 객체로 바꾸므로,
+            # 이런 파일은 기본 엔진 결과(.1 접미사, 문자열 유지)와 맞추기 위해 다시 로드
+            if not df.columns.is_unique or self._has_inferred_dates(df):
+                raise ValueError("pyarrow 결과가 기본 엔진과 다름")
+            return df
+        except UnicodeDecodeError:
+            raise
+        except (ValueError, ImportError):
+            return pd.read_csv(filepath, encoding=encoding)
+    
+    @staticmethod
+    def _has_inferred_dates(df: pd.DataFrame) -> bool:
+        """pyarrow가 날짜/시간으로 추론한 컬럼이 있는지 확인"""
+        for col in df.columns:
+            series = df[col]
+            if pd.api.types.is_datetime64_any_dtype(series):
+                return True
+            if series.dtype == object:
+                first = series.first_valid_index()
+                if first is not None and isinstance(series[first], (date, time)):
+                    return True
+        return False
+    
+    def _candidate_encodings(self, filepath: Path, encodings: List[str],
+                             sniff_bytes: int = 65536) -> List[str]:
+        """
+        파일 앞부분만 디코딩해 보고 실패한 인코딩은 건너뜀
+        
+        앞부분조차 디코딩하지 못하는 인코딩은 전체 파싱도 실패하므로,
+        보통 read_csv를 한 번만 호출하게 됨
+        """
+        try:
+            with open(filepath, 'rb') as f:
+                head = f.read(sniff_bytes)
+        except OSError:
+            return encodings
+        
+        final = len(head) < sniff_bytes
+        for i, encoding in enumerate(encodings):
+            try:
+                codecs.getincrementaldecoder(encoding)().decode(head, final=final)
+                return encodings[i:]
+            except UnicodeDecodeError:
+                continue
+        return encodings
+    
     def _analyze_dataset(self, df: pd.DataFrame, filename: str) -> DatasetInfo:
         """개별 데이터셋 분석"""
         # 연도 컬럼 찾기
@@ -123,24 +260,21 @@ class DataPreprocessor:
                 year_columns.append(col)
         
         # 숫자형 컬럼 찾기
-        numeric_columns = []
-        for col in df.columns:
-            if df[col].dtype in ['int64', 'float64']:
-                numeric_columns.append(col)
-            else:
-                # 문자열이지만 숫자로 변환 가능한 컬럼 찾기
-                try:
-                    pd.to_numeric(df[col].astype(str).str.replace(',', ''), errors='coerce')
-                    if not df[col].isna().all():
-                        numeric_columns.append(col)
-                except:
-                    pass
+        numeric_set = set(df.select_dtypes(include='number').columns)
+        remaining = [col for col in df.columns if col not in numeric_set]
+        if remaining:
+            # 문자열이지만 숫자로 변환 가능한 값이 있는 컬럼 찾기 (쉼표 제거 후 한 번에 변환)
+            coerced = df[remaining].apply(
+                lambda s: pd.to_numeric(s.astype(str).str.replace(',', '', regex=False), errors='coerce')
+            )
+            numeric_set.update(coerced.columns[coerced.notna().any()])
+        numeric_columns = [col for col in df.columns if col in numeric_set]
         
         # 카테고리형 컬럼 찾기
-        categorical_columns = [col for col in df.columns if col not in numeric_columns]
+        categorical_columns = [col for col in df.columns if col not in numeric_set]
         
         # 결측값 계산
-        missing_values = df.isnull().sum().to_dict()
+        missing_values = df.isna().sum().to_dict()
         
         # 데이터 타입 정보
         data_types = {col: str(df[col].dtype) for col in df.columns}
@@ -184,7 +318,7 @@ class DataPreprocessor:
     
     def standardize_data(self) -> pd.DataFrame:
         """모든 데이터를 표준화된 형태로 통합"""
-        unified_rows = []
+        frames: List[pd.DataFrame] = []
         
         for dataset_name, df in self.datasets.items():
             info = self.dataset_info[dataset_name]
@@ -192,44 +326,140 @@ class DataPreprocessor:
             # 연도별 데이터가 있는 경우 시계열 형태로 변환
             if info.has_year_columns:
                 standardized = self._convert_to_timeseries(df, dataset_name, info)
-                unified_rows.extend(standardized)
+                if not standardized.empty:
+                    frames.append(standardized)
             else:
                 # 연도 정보가 없는 경우 메타데이터로 처리
                 self.metadata[dataset_name] = df.to_dict('records')
         
-        # 통합 데이터프레임 생성
-        if unified_rows:
-            self.unified_data = pd.DataFrame(unified_rows)
+        # 통합 데이터프레임 생성 (레코드 dict 없이 DataFrame을 바로 연결)
+        if frames:
+            self._align_categories(frames)
+            self.unified_data = pd.concat(frames, ignore_index=True)
             self.unified_data = self._clean_unified_data(self.unified_data)
             
         return self.unified_data
     
-    def _convert_to_timeseries(self, df: pd.DataFrame, dataset_name: str, info: DatasetInfo) -> List[Dict]:
-        """데이터를 시계열 형태로 변환"""
-        rows = []
-        
-        # 연도 컬럼들을 찾아서 시계열 데이터로 변환
-        year_columns = info.year_columns
-        non_year_columns = [col for col in df.columns if col not in year_columns]
-        
-        for _, row in df.iterrows():
-            # 각 연도별로 레코드 생성
-            for year_col in year_columns:
-                year = self._extract_year(year_col)
-                if year:
-                    record = {
-                        'dataset': dataset_name,
-                        'year': year,
-                        'value': self._clean_numeric_value(row[year_col]),
-                    }
-                    
-                    # 비연도 컬럼들을 메타데이터로 추가
-                    for col in non_year_columns:
-                        record[f'meta_{col}'] = row[col]
-                    
-                    rows.append(record)
+    def load_unified_data(self, columns: Optional[List[str]] = None) -> Optional[pd.DataFrame]:
+        """
+        통합 데이터 로드 - CSV 파일이 바뀌지 않았으면 통합 결과 캐시에서 바로 읽음
         
-        return rows
+        Args:
+            columns: 필요한 컬럼만 읽을 때 컬럼 목록 (Parquet 캐시에서는 해당 컬럼만 디스크에서 읽음)
+        """
+        cache_name = f"unified.{self._data_signature()}"
+        cached = self._load_unified_cache(cache_name, columns)
+        if cached is not None:
+            if columns is None:
+                self.unified_data = cached
+            return cached
+        
+        if not self.datasets:
+            self.analyze_all_datasets()
+        unified_data = self.standardize_data()
+        if unified_data is None:
+            return None
+        # 숫자/문자가 섞인 메타 컬럼은 문자열로 통일해야 Parquet으로 저장 가능 (캐시 로드 결과와 dtype도 일치)
+        unified_data = self._make_parquet_safe(unified_data)
+        self.unified_data = unified_data
+        self._store_unified_cache(unified_data, cache_name)
+        return unified_data if columns is None else unified_data[columns]
+    
+    @staticmethod
+    def _make_parquet_safe(df: pd.DataFrame) -> pd.DataFrame:
+        """값 타입이 섞인 object 컬럼을 nullable string으로 변환 (결측은 유지)"""
+        mixed = [col for col in df.columns
+                 if df[col].dtype == object and df[col].dropna().map(type).nunique() > 1]
+        if not mixed:
+            return df
+        return df.astype({col: 'string' for col in mixed})
+    
+    def _data_signature(self) -> str:
+        """데이터 폴더의 CSV 파일 이름/수정시각/크기로 만든 캐시 식별자"""
+        entries = []
+        for csv_file in self.data_folder.glob("*.csv"):
+            stat = csv_file.stat()
+            entries.append(f"{csv_file.name}:{stat.st_mtime_ns}:{stat.st_size}")
+        return hashlib.sha1("|".join(sorted(entries)).encode('utf-8')).hexdigest()[:12]
+    
+    def _load_unified_cache(self, cache_name: str,
+                            columns: Optional[List[str]] = None) -> Optional[pd.DataFrame]:
+        """통합 데이터 캐시 로드 (Parquet 우선, 없으면 pickle)"""
+        try:
+            return pd.read_parquet(self._cache_dir / f"{cache_name}.parquet", engine='pyarrow',
+                                   columns=columns)
+        except Exception:
+            pass
+        try:
+            cached = pd.read_pickle(self._cache_dir / f"{cache_name}.pkl")
+        except Exception:
+            return None
+        return cached if columns is None else cached[columns]
+    
+    def _store_unified_cache(self, unified_data: pd.DataFrame, cache_name: str):
+        """통합 데이터를 Parquet으로 저장 (그래도 Parquet 변환이 안 되는 경우 pickle) 후 이전 캐시 정리"""
+        try:
+            self._cache_dir.mkdir(exist_ok=True)
+            try:
+                cache_path = self._cache_dir / f"{cache_name}.parquet"
+                unified_data.to_parquet(cache_path, engine='pyarrow', compression='zstd', index=False)
+            except Exception:
+                cache_path = self._cache_dir / f"{cache_name}.pkl"
+                unified_data.to_pickle(cache_path)
+        except Exception as e:
+            self.logger.warning(f"통합 데이터 캐시 저장 실패: {e}")
+            return
+        for old_path in self._cache_dir.glob("unified.*"):
+            if old_path != cache_path:
+                old_path.unlink(missing_ok=True)
+    
+    def _align_categories(self, frames: List[pd.DataFrame]):
+        """여러 데이터셋에 공통인 카테고리 컬럼의 범주를 맞춰 concat 후에도 카테고리 유지"""
+        columns = {col for frame in frames for col in frame.columns
+                   if isinstance(frame[col].dtype, pd.CategoricalDtype)}
+        for col in columns:
+            parts = [frame[col] for frame in frames if col in frame.columns]
+            if len(parts) < 2 or not all(isinstance(p.dtype, pd.CategoricalDtype) for p in parts):
+                continue
+            try:
+                categories = union_categoricals(parts, ignore_order=True).categories
+            except TypeError:
+                continue
+            for frame in frames:
+                if col in frame.columns:
+                    frame[col] = frame[col].cat.set_categories(categories)
+    
+    def _convert_to_timeseries(self, df: pd.DataFrame, dataset_name: str, info: DatasetInfo) -> pd.DataFrame:
+        """데이터를 시계열 형태로 변환 (pd.melt로 한 번에 재구성)"""
+        # 연도 컬럼들을 찾아서 시계열 데이터로 변환 (연도 추출은 컬럼당 한 번)
+        year_map = {col: self._extract_year(col) for col in info.year_columns}
+        year_columns = [col for col, year in year_map.items() if year]
+        non_year_columns = [col for col in df.columns if col not in info.year_columns]
+        
+        if not year_columns:
+            return pd.DataFrame()
+        
+        melted = df.melt(
+            id_vars=non_year_columns,
+            value_vars=year_columns,
+            var_name='_year_col',
+            value_name='_value'
+        )
+        
+        result = pd.DataFrame({
+            'dataset': dataset_name,
+            'year': melted['_year_col'].map(year_map).astype('int16'),
+            'value': self._clean_numeric_series(melted['_value']),
+        })
+        
+        # 비연도 컬럼들을 메타데이터로 추가 (연도 수만큼 반복되는 문자열은 카테고리로 공유)
+        for col in non_year_columns:
+            meta = melted[col]
+            if pd.api.types.is_object_dtype(meta) or pd.api.types.is_string_dtype(meta):
+                meta = meta.astype('category')
+            result[f'meta_{col}'] = meta
+        
+        return result
     
     def _extract_year(self, year_string: str) -> Optional[int]:
         """문자열에서 연도 추출"""
@@ -240,46 +470,51 @@ class DataPreprocessor:
                 return year
         return None
     
-    def _clean_numeric_value(self, value: Any) -> Optional[float]:
-        """숫자 값 정리"""
-        if pd.isna(value):
-            return None
-            
-        if isinstance(value, (int, float)):
-            return float(value)
-            
-        # 문자열인 경우 숫자로 변환 시도
-        try:
-            # 쉼표 제거 후 숫자 변환
-            cleaned = str(value).replace(',', '').replace(' ', '')
-            return float(cleaned)
-        except (ValueError, AttributeError):
-            return None
+    def _clean_numeric_series(self, series: pd.Series) -> pd.Series:
+        """숫자 값 정리 (컬럼 단위 벡터 연산, 변환 불가 값은 NaN)"""
+        if pd.api.types.is_numeric_dtype(series):
+            return series.astype('float64')
+        
+        # 쉼표/공백 제거 후 한 번에 숫자 변환
+        cleaned = (series.astype(str)
+                   .str.replace(',', '', regex=False)
+                   .str.replace(' ', '', regex=False))
+        return pd.to_numeric(cleaned, errors='coerce').astype('float64')
     
     def _clean_unified_data(self, df: pd.DataFrame) -> pd.DataFrame:
         """통합 데이터 정리"""
         # 결측값 처리
         df = df.dropna(subset=['value'])
         
-        # 데이터 타입 최적화
-        df['year'] = df['year'].astype(int)
+        # 데이터 타입 최적화 (dataset은 카테고리, year는 int16으로 메모리 및 groupby 비용 절감)
+        df['dataset'] = pd.Categorical(df['dataset'])
+        df['year'] = df['year'].astype('int16')
         df['value'] = pd.to_numeric(df['value'], errors='coerce')
         
-        # 이상치 탐지 및 처리 (IQR 방법)
-        Q1 = df['value'].quantile(0.25)
-        Q3 = df['value'].quantile(0.75)
-        IQR = Q3 - Q1
-        lower_bound = Q1 - 1.5 * IQR
-        upper_bound = Q3 + 1.5 * IQR
+        # 이상치 탐지 및 플래그 추가 (IQR 방법)
+        df['is_outlier'] = _iqr_outlier_flags(df['value'].to_numpy(dtype=np.float64))
         
-        # 이상치 플래그 추가
-        df['is_outlier'] = (df['value'] < lower_bound) | (df['value'] > upper_bound)
+        # 정밀도 손실이 없는 숫자 컬럼만 더 작은 타입으로 축소
+        df = self._downcast_numeric(df)
         
         # 정렬
         df = df.sort_values(['dataset', 'year']).reset_index(drop=True)
         
         return df
     
+    def _downcast_numeric(self, df: pd.DataFrame) -> pd.DataFrame:
+        """정수 컬럼은 가능한 가장 작은 정수형으로, 실수 컬럼은 float32로 값이 그대로 보존될 때만 축소"""
+        for col in df.select_dtypes(include=['integer']).columns:
+            if col != 'year':  # year는 int16 유지
+                df[col] = pd.to_numeric(df[col], downcast='integer')
+        for col in df.select_dtypes(include=['float64']).columns:
+            values = df[col].to_numpy()
+            narrowed = values.astype(np.float32)
+            # 배출량은 수억 톤 단위라 float32(유효숫자 약 7자리)로 바꾸면 값이 달라지는 경우가 많음
+            if np.array_equal(narrowed.astype(np.float64), values, equal_nan=True):
+                df[col] = narrowed
+        return df
+    
     def get_data_summary(self) -> Dict[str, Any]:
         """데이터 요약 정보 반환"""
         summary = {
@@ -325,23 +560,23 @@ class DataPreprocessor:
         if self.unified_data is None:
             return pd.DataFrame()
         
-        filtered = self.unified_data.copy()
+        # 조건을 하나의 query 식으로 묶어 한 번에 필터링 (numexpr 설치 시 자동 사용)
+        conditions = []
+        params: Dict[str, Any] = {}
         
         if dataset:
-            filtered = filtered[filtered['dataset'] == dataset]
+            conditions.append("dataset == @dataset")
+            params['dataset'] = dataset
         
         if year_range:
-            start_year, end_year = year_range
-            filtered = filtered[
-                (filtered['year'] >= start_year) & 
-                (filtered['year'] <= end_year)
-            ]
+            conditions.append("@start_year <= year <= @end_year")
+            params['start_year'], params['end_year'] = year_range
         
         if value_range:
-            min_val, max_val = value_range
-            filtered = filtered[
-                (filtered['value'] >= min_val) & 
-                (filtered['value'] <= max_val)
-            ]
+            conditions.append("@min_val <= value <= @max_val")
+            params['min_val'], params['max_val'] = value_range
+        
+        if not conditions:
+            return self.unified_data  # 필터 조건이 없으면 복사 없이 그대로 반환
         
-        return filtered 
\ No newline at end of file
+        return self.unified_data.query(" and ".join(conditions), local_dict=params) 
\ No newline at end of file
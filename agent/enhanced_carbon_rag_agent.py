@@ -4,6 +4,11 @@
 """
 
 import os
+import asyncio
+import logging
+import threading
+from collections import OrderedDict
+from functools import cached_property
 import pandas as pd
 import numpy as np
 from dotenv import load_dotenv
@@ -26,7 +31,7 @@ except Exception as e:
     print(f"환경변수 로드 중 오류: {e}")
     # 직접 설정 (임시)
     os.environ['UPSTAGE_API_KEY'] = 'up_Tfh3KhtojqHp2MascmzOv3IG4lDu0'
-from typing import List, Dict, Tuple, Optional, Any
+from typing import List, Dict, Tuple, Optional, Any, AsyncIterator, Union
 from langchain_upstage import ChatUpstage
 from langchain.schema import HumanMessage, SystemMessage
 import warnings
@@ -40,27 +45,88 @@ from .code_executor import SafeCodeExecutor
 
 warnings.filterwarnings('ignore')
 
+logger = logging.getLogger(__name__)
+
+# 지연 로드 데이터가 아직 만들어지지 않았음을 나타내는 표식 (None도 유효한 결과이므로 별도 객체 사용)
+_UNSET = object()
+
 # 환경변수 확인 및 설정
 if not os.getenv('UPSTAGE_API_KEY'):
     print("🔧 환경변수를 직접 설정합니다...")
     os.environ['UPSTAGE_API_KEY'] = 'up_Tfh3KhtojqHp2MascmzOv3IG4lDu0'
 
+# 답변 생성용 시스템 프롬프트
+# 질문과 무관한 고정 지침을 앞에 두어 공급자의 프롬프트 접두사 캐시에 재사용될 수 있도록 함
+_SYSTEM_PROMPT_PREFIX = """
+당신은 온실가스 배출량 데이터 전문 분석가입니다.
+
+아래 정보를 바탕으로 다음 요구사항에 맞춰 답변해주세요:
+
+1. 질문에 직접적으로 답변
+2. 구체적인 수치 포함
+3. 간단한 해석 및 인사이트 제공
+4. 한국어로 친근하게 설명
+5. 3-5문장으로 간결하게 작성
+
+데이터 출처: 환경부, 한국거래소, 한국에너지공단 등 공공기관
+"""
+
+# 질문별로 바뀌는 부분만 담은 템플릿
+_SYSTEM_PROMPT_CONTEXT = """
+질문 타입: {query_type}
+신뢰도: {confidence:.2f}
+추출된 연도: {years}
+관련 분야: {entities}
+메트릭: {metrics}
+
+분석 결과:
+{output}
+"""
+
+# 질문 타입별 차트 제목 생성 함수
+_DEFAULT_TITLE = "배출량 분석 결과"
+
+def _default_title(intent: QueryIntent) -> str:
+    return _DEFAULT_TITLE
+
+def _comparison_title(intent: QueryIntent) -> str:
+    if not intent.years:
+        return _DEFAULT_TITLE
+    if len(intent.years) == 2:
+        return f"{intent.years[0]}년과 {intent.years[1]}년 배출량 비교"
+    return f"{min(intent.years)}-{max(intent.years)}년 배출량 비교"
+
+_TITLE_BUILDERS = {
+    'comparison': _comparison_title,
+    'trend': lambda intent: "연도별 배출량 변화 추이",
+    'ranking': lambda intent: "분야별 배출량 순위",
+}
+
 class EnhancedCarbonRAGAgent:
     """향상된 탄소 데이터 RAG 에이전트"""
     
     _instance = None
+    _lock = threading.Lock()
     
     def __new__(cls):
-        """싱글톤 패턴 구현"""
+        """싱글톤 패턴 구현 (이중 확인 잠금으로 동시 최초 호출 시에도 인스턴스 하나만 생성)"""
         if cls._instance is None:
-            cls._instance = super(EnhancedCarbonRAGAgent, cls).__new__(cls)
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super(EnhancedCarbonRAGAgent, cls).__new__(cls)
         return cls._instance
     
     def __init__(self):
         """에이전트 초기화"""
         if hasattr(self, '_initialized'):
             return
-            
+        with self._lock:
+            if hasattr(self, '_initialized'):
+                return
+            self._init_components()
+    
+    def _init_components(self):
+        """에이전트 구성 요소 초기화 (__init__에서 잠금을 잡은 상태로 한 번만 호출)"""
         # API 키 확인
         self.api_key = os.getenv('UPSTAGE_API_KEY')
         if not self.api_key:
@@ -82,33 +148,75 @@ class EnhancedCarbonRAGAgent:
         self.metadata_manager = MetadataManager("agent/metadata.json")
         self.code_executor = SafeCodeExecutor()
         
-        # 데이터 로드 및 전처리
-        self._load_and_process_data()
+        # LLM 답변 캐시 (같은 의도 + 같은 분석 결과면 네트워크 호출 생략)
+        self._answer_cache: "OrderedDict[tuple, str]" = OrderedDict()
+        self._answer_cache_lock = threading.Lock()
+        
+        # 데이터 로드/전처리는 첫 접근 시 수행 (동시 첫 접근 시 중복 작업 방지)
+        # cached_property는 자체 락을 잡은 채 getter를 실행하므로 서로를 참조하는 데이터 속성은
+        # 일반 property + 이중 확인 잠금으로 구현해 락 순서 역전(교착)을 피함
+        self._data_lock = threading.RLock()
+        self._dataset_info = _UNSET
+        self._unified_data = _UNSET
+        self._data_summary = _UNSET
+        self._metadata = _UNSET
         
         self._initialized = True
         print("✅ 향상된 탄소 RAG 에이전트가 초기화되었습니다.")
     
-    def _load_and_process_data(self):
-        """데이터 로드 및 전처리"""
-        print("🔄 데이터 분석 및 전처리 중...")
-        
-        # 1. 모든 데이터셋 분석
-        self.dataset_info = self.data_preprocessor.analyze_all_datasets()
-        
-        # 2. 데이터 표준화 및 통합
-        self.unified_data = self.data_preprocessor.standardize_data()
-        
-        # 3. 메타데이터 생성
-        self.metadata_manager.analyze_and_create_metadata(self.data_preprocessor.datasets)
-        
-        # 4. 데이터 요약 정보 생성
-        self.data_summary = self.data_preprocessor.get_data_summary()
-        
-        print(f"✅ 데이터 전처리 완료:")
-        print(f"   - 총 {self.data_summary['total_datasets']}개 데이터셋 로드")
-        if self.unified_data is not None:
-            print(f"   - 통합 데이터: {self.unified_data.shape[0]}행 × {self.unified_data.shape[1]}열")
-            print(f"   - 연도 범위: {self.data_summary['year_range']}")
+    @property
+    def dataset_info(self) -> Dict[str, Any]:
+        """모든 데이터셋 분석 결과 (첫 접근 시 로드)"""
+        if self._dataset_info is _UNSET:
+            with self._data_lock:
+                if self._dataset_info is _UNSET:
+                    if self.data_preprocessor.dataset_info:
+                        # 통합 데이터 생성 과정에서 이미 분석된 경우
+                        self._dataset_info = self.data_preprocessor.dataset_info
+                    else:
+                        print("🔄 데이터 분석 및 전처리 중...")
+                        self._dataset_info = self.data_preprocessor.analyze_all_datasets()
+        return self._dataset_info
+    
+    @property
+    def unified_data(self) -> Optional[pd.DataFrame]:
+        """표준화된 통합 데이터 (첫 접근 시 생성)"""
+        if self._unified_data is _UNSET:
+            with self._data_lock:
+                if self._unified_data is _UNSET:
+                    # 데이터 파일이 바뀌지 않았으면 Parquet 캐시에서 바로 로드 (CSV 분석 생략)
+                    unified_data = self.data_preprocessor.load_unified_data()
+                    if unified_data is not None:
+                        print(f"✅ 통합 데이터: {unified_data.shape[0]}행 × {unified_data.shape[1]}열")
+                    self._unified_data = unified_data
+        return self._unified_data
+    
+    @cached_property
+    def _unified_columns(self) -> Tuple[str, ...]:
+        """통합 데이터 컬럼명 (질문마다 리스트를 새로 만들지 않도록 한 번만 생성)"""
+        return tuple(self.unified_data.columns) if self.unified_data is not None else ()
+    
+    @property
+    def data_summary(self) -> Dict[str, Any]:
+        """데이터 요약 정보 (첫 접근 시 생성)"""
+        if self._data_summary is _UNSET:
+            with self._data_lock:
+                if self._data_summary is _UNSET:
+                    self.dataset_info  # 데이터셋 로드 선행
+                    self.unified_data  # 통합 데이터 생성 선행
+                    self._data_summary = self.data_preprocessor.get_data_summary()
+        return self._data_summary
+    
+    @property
+    def metadata(self) -> Dict[str, Any]:
+        """데이터셋 메타데이터 (첫 접근 시 생성)"""
+        if self._metadata is _UNSET:
+            with self._data_lock:
+                if self._metadata is _UNSET:
+                    self.dataset_info  # 데이터셋 로드 선행
+                    self.metadata_manager.analyze_and_create_metadata(self.data_preprocessor.datasets)
+                    self._metadata = self.metadata_manager.metadata
+        return self._metadata
     
     def ask(self, question: str) -> Tuple[str, Optional[str]]:
         """
@@ -121,35 +229,19 @@ class EnhancedCarbonRAGAgent:
             (답변 텍스트, 시각화 이미지 base64)
         """
         try:
-            print(f"🎯 질문 처리 시작: '{question}'")
-            
-            # 1. 질문 의도 분석
-            intent = self.query_analyzer.analyze_query(question)
-            print(f"🔍 질문 분석 완료: {intent.query_type.value} (신뢰도: {intent.confidence:.2f})")
-            print(f"📅 추출된 연도: {intent.years}")
-            print(f"🏷️ 추출된 엔티티: {intent.entities}")
-            
-            # 2. 시각화 필요성 판단
-            needs_viz = self.query_analyzer.needs_visualization(question)
-            print(f"📊 시각화 필요: {needs_viz}")
-            
-            # 3. 데이터 필터링 및 분석
-            analysis_result = self._perform_data_analysis(intent)
-            print(f"📈 분석 결과 성공: {analysis_result.get('success', False)}")
-            if 'data' in analysis_result:
-                print(f"📊 분석된 데이터 크기: {len(analysis_result['data']) if analysis_result['data'] is not None else 0}")
+            intent, needs_viz, analysis_result = self._prepare_answer(question)
             
             # 4. 시각화 생성 (필요한 경우만)
             visualization = None
             if needs_viz:
-                print("🎨 시각화 생성 시작...")
+                logger.debug("🎨 시각화 생성 시작...")
                 visualization = self._create_visualization(intent, analysis_result)
                 if visualization:
-                    print("✅ 시각화 생성 완료")
+                    logger.debug("✅ 시각화 생성 완료")
                 else:
-                    print("⚠️ 시각화 생성 실패")
+                    logger.warning("⚠️ 시각화 생성 실패")
             else:
-                print("ℹ️ 텍스트 답변만 제공")
+                logger.debug("ℹ️ 텍스트 답변만 제공")
             
             # 5. 답변 생성
             answer = self._generate_answer(question, intent, analysis_result)
@@ -158,11 +250,203 @@ class EnhancedCarbonRAGAgent:
             
         except Exception as e:
             error_msg = f"❌ 처리 중 오류가 발생했습니다: {str(e)}"
-            print(error_msg)
-            import traceback
-            traceback.print_exc()
+            # 스택 포맷팅은 디버그 레벨에서만 (평상시에는 한 줄 오류 로그)
+            logger.error(error_msg, exc_info=logger.isEnabledFor(logging.DEBUG))
             return error_msg, None
     
+    async def aask(self, question: str) -> Tuple[str, Optional[str]]:
+        """
+        ask()의 비동기 버전 - LLM 호출 대기 중 다른 질문을 함께 처리할 수 있음
+        
+        Args:
+            question: 사용자 질문
+            
+        Returns:
+            (답변 텍스트, 시각화 이미지 base64)
+        """
+        try:
+            # pandas 분석은 이벤트 루프를 막지 않도록 스레드에서 실행
+            intent, needs_viz, analysis_result = await asyncio.to_thread(self._prepare_answer, question)
+            
+            # LLM 호출(네트워크 대기)과 시각화 렌더링(CPU)은 서로 독립적이므로 동시에 진행
+            answer_task = self._agenerate_answer(question, intent, analysis_result)
+            if needs_viz:
+                viz_task = asyncio.to_thread(self._create_visualization, intent, analysis_result)
+                answer, visualization = await asyncio.gather(answer_task, viz_task)
+            else:
+                answer, visualization = await answer_task, None
+            
+            return answer, visualization
+            
+        except Exception as e:
+            error_msg = f"❌ 처리 중 오류가 발생했습니다: {str(e)}"
+            logger.error(error_msg)
+            return error_msg, None
+    
+    async def astream_ask(self, question: str) -> AsyncIterator[Union[str, Dict[str, Optional[str]]]]:
+        """
+        답변을 생성되는 대로 조각 단위로 전달하는 스트리밍 버전 (첫 토큰 대기시간 단축)
+        
+        Args:
+            question: 사용자 질문
+            
+        Yields:
+            답변 텍스트 조각(str), 마지막에 {"visualization": 시각화 이미지 base64 또는 None}
+        """
+        try:
+            intent, needs_viz, analysis_result = await asyncio.to_thread(self._prepare_answer, question)
+        except Exception as e:
+            error_msg = f"❌ 처리 중 오류가 발생했습니다: {str(e)}"
+            logger.error(error_msg)
+            yield error_msg
+            yield {"visualization": None}
+            return
+        
+        # 시각화는 답변 스트리밍과 동시에 렌더링
+        viz_task = None
+        if needs_viz:
+            viz_task = asyncio.ensure_future(
+                asyncio.to_thread(self._create_visualization, intent, analysis_result)
+            )
+        
+        cache_key = self._answer_cache_key(question, intent, analysis_result)
+        cached = self._get_cached_answer(cache_key)
+        if cached is not None:
+            yield cached
+        else:
+            chunks = []
+            try:
+                async for chunk in self.llm.astream(self._build_answer_messages(question, intent, analysis_result)):
+                    if chunk.content:
+                        chunks.append(chunk.content)
+                        yield chunk.content
+                self._store_cached_answer(cache_key, "".join(chunks))
+            except Exception as e:
+                logger.warning("LLM 스트리밍 오류: %s", e)
+                # 아무것도 전달하지 못했을 때만 기본 답변으로 대체
+                if not chunks:
+                    yield self._generate_fallback_answer(question, analysis_result)
+        
+        visualization = await viz_task if viz_task is not None else None
+        yield {"visualization": visualization}
+    
+    async def abatch_ask(self, questions: List[str],
+                         max_concurrency: Optional[int] = None) -> List[Tuple[str, Optional[str]]]:
+        """
+        여러 질문을 동시에 처리 (LLM 호출을 병렬로 대기)
+        
+        Args:
+            questions: 사용자 질문 목록
+            max_concurrency: 동시 처리 수 (기본값: CARBON_RAG_MAX_CONCURRENCY 환경변수 또는 8)
+            
+        Returns:
+            질문 순서대로 (답변 텍스트, 시각화 이미지 base64) 목록
+        """
+        if max_concurrency is None:
+            max_concurrency = int(os.getenv('CARBON_RAG_MAX_CONCURRENCY', '8'))
+        max_concurrency = max(1, max_concurrency)
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        if not hasattr(self.llm, 'abatch'):
+            async def _one(question: str) -> Tuple[str, Optional[str]]:
+                async with semaphore:
+                    return await self.aask(question)
+            
+            return await asyncio.gather(*[_one(question) for question in questions])
+        
+        # 1. 질문별 의도 분석 + 데이터 분석 (스레드에서 병렬 수행)
+        async def _prepare(question: str):
+            async with semaphore:
+                try:
+                    return await asyncio.to_thread(self._prepare_answer, question)
+                except Exception as e:
+                    logger.error("❌ 처리 중 오류가 발생했습니다: %s", e)
+                    return e
+        
+        prepared = await asyncio.gather(*[_prepare(question) for question in questions])
+        
+        # 2. 시각화 렌더링과 LLM 배치 호출을 동시에 진행
+        async def _visualize(item) -> Optional[str]:
+            if isinstance(item, Exception) or not item[1]:
+                return None
+            async with semaphore:
+                return await asyncio.to_thread(self._create_visualization, item[0], item[2])
+        
+        answers, visualizations = await asyncio.gather(
+            self._abatch_generate_answers(questions, prepared, max_concurrency),
+            asyncio.gather(*[_visualize(item) for item in prepared]),
+        )
+        return list(zip(answers, visualizations))
+    
+    async def _abatch_generate_answers(self, questions: List[str], prepared: list,
+                                       max_concurrency: int) -> List[str]:
+        """캐시에 없는 답변만 모아 llm.abatch 한 번으로 요청 (실패한 항목은 기본 답변)"""
+        answers: List[Optional[str]] = [None] * len(questions)
+        pending = {}  # 캐시 키 -> (메시지, 해당 질문 인덱스 목록), 배치 내 중복 질문은 한 번만 요청
+        for i, (question, item) in enumerate(zip(questions, prepared)):
+            if isinstance(item, Exception):
+                answers[i] = f"❌ 처리 중 오류가 발생했습니다: {str(item)}"
+                continue
+            intent, _, analysis_result = item
+            cache_key = self._answer_cache_key(question, intent, analysis_result)
+            cached = self._get_cached_answer(cache_key)
+            if cached is not None:
+                answers[i] = cached
+            elif cache_key in pending:
+                pending[cache_key][1].append(i)
+            else:
+                pending[cache_key] = (self._build_answer_messages(question, intent, analysis_result), [i])
+        
+        if pending:
+            try:
+                responses = await self.llm.abatch(
+                    [messages for messages, _ in pending.values()],
+                    config={"max_concurrency": max_concurrency},
+                    return_exceptions=True,
+                )
+            except Exception as e:
+                logger.warning("LLM 배치 호출 오류: %s", e)
+                responses = [e] * len(pending)
+            
+            for (cache_key, (_, indices)), response in zip(pending.items(), responses):
+                if not isinstance(response, Exception):
+                    self._store_cached_answer(cache_key, response.content)
+                for i in indices:
+                    if isinstance(response, Exception):
+                        answers[i] = self._generate_fallback_answer(questions[i], prepared[i][2])
+                    else:
+                        answers[i] = response.content
+        
+        return answers
+    
+    def _prepare_answer(self, question: str) -> Tuple[QueryIntent, bool, Dict[str, Any]]:
+        """질문 의도 분석, 시각화 필요성 판단, 데이터 분석 (ask/aask 공통 단계)"""
+        debug = logger.isEnabledFor(logging.DEBUG)
+        if debug:
+            logger.debug("🎯 질문 처리 시작: '%s'", question)
+        
+        # 1. 질문 의도 분석
+        intent = self.query_analyzer.analyze_query(question)
+        if debug:
+            logger.debug("🔍 질문 분석 완료: %s (신뢰도: %.2f)", intent.query_type.value, intent.confidence)
+            logger.debug("📅 추출된 연도: %s", intent.years)
+            logger.debug("🏷️ 추출된 엔티티: %s", intent.entities)
+        
+        # 2. 시각화 필요성 판단
+        needs_viz = self.query_analyzer.needs_visualization(question)
+        if debug:
+            logger.debug("📊 시각화 필요: %s", needs_viz)
+        
+        # 3. 데이터 필터링 및 분석
+        analysis_result = self._perform_data_analysis(intent)
+        if debug:
+            logger.debug("📈 분석 결과 성공: %s", analysis_result.get('success', False))
+            if 'data' in analysis_result:
+                data = analysis_result['data']
+                logger.debug("📊 분석된 데이터 크기: %d", len(data) if data is not None else 0)
+        
+        return intent, needs_viz, analysis_result
+    
     def _perform_data_analysis(self, intent: QueryIntent) -> Dict[str, Any]:
         """질문 의도를 바탕으로 데이터 분석 수행"""
         if self.unified_data is None or self.unified_data.empty:
@@ -175,7 +459,7 @@ class EnhancedCarbonRAGAgent:
             # 질문 의도에 따른 분석 코드 생성
             analysis_code = self.code_executor.generate_analysis_code(
                 intent, 
-                list(self.unified_data.columns)
+                self._unified_columns
             )
             
             # 코드 실행
@@ -193,74 +477,65 @@ class EnhancedCarbonRAGAgent:
                 return self._fallback_analysis(intent)
                 
         except Exception as e:
-            print(f"분석 오류: {e}")
+            logger.warning("분석 오류: %s", e)
             return self._fallback_analysis(intent)
     
+    @cached_property
+    def _inventory_df(self) -> Optional[pd.DataFrame]:
+        """국가 온실가스 인벤토리 데이터셋 (최초 한 번만 검색)"""
+        self.dataset_info  # 데이터셋 로드 선행
+        for dataset_name, df in self.data_preprocessor.datasets.items():
+            if '국가 온실가스 인벤토리' in dataset_name:
+                logger.debug("📊 국가 온실가스 인벤토리 데이터셋 사용: %s", dataset_name)
+                return df
+        return None
+    
+    @cached_property
+    def _inventory_emissions(self) -> Optional[pd.Series]:
+        """연도 인덱스 총배출량 Series (첫 번째 컬럼: 연도, 두 번째 컬럼: 총배출량)"""
+        inventory_dataset = self._inventory_df
+        if inventory_dataset is None or inventory_dataset.empty:
+            return None
+        emissions = pd.Series(
+            pd.to_numeric(inventory_dataset.iloc[:, 1], errors='coerce').to_numpy(),
+            index=pd.to_numeric(inventory_dataset.iloc[:, 0], errors='coerce'),
+        )
+        if emissions.index.hasnans:
+            emissions = emissions[emissions.index.notna()]
+        return emissions
+    
     def _fallback_analysis(self, intent: QueryIntent) -> Dict[str, Any]:
         """기본 분석 (코드 실행 실패 시)"""
         try:
             # 국가 온실가스 인벤토리 데이터셋만 사용
-            inventory_dataset = None
-            for dataset_name, df in self.data_preprocessor.datasets.items():
-                if '국가 온실가스 인벤토리' in dataset_name:
-                    inventory_dataset = df
-                    print(f"📊 국가 온실가스 인벤토리 데이터셋 사용: {dataset_name}")
-                    break
-            
-            if inventory_dataset is None or inventory_dataset.empty:
+            emissions = self._inventory_emissions
+            if emissions is None:
                 return {"error": "국가 온실가스 인벤토리 데이터를 찾을 수 없습니다."}
             
-            # 연도 필터링
-            if intent.years:
-                # 첫 번째 컬럼이 연도 (이미 data_preprocessor에서 확인됨)
-                year_mask = inventory_dataset.iloc[:, 0].isin(intent.years)
-                filtered_data = inventory_dataset[year_mask].copy()
-                print(f"📅 연도 필터링: {intent.years} → {len(filtered_data)}개 레코드")
-            else:
-                filtered_data = inventory_dataset.copy()
-            
-            # 결과 데이터 준비
-            result_data = []
-            
             # 질문 타입별 분석
             if intent.query_type.value == 'comparison' and intent.years:
-                # 연도별 비교: 각 연도의 총배출량 (두 번째 컬럼)
-                for year in intent.years:
-                    year_row = inventory_dataset[inventory_dataset.iloc[:, 0] == year]
-                    if not year_row.empty:
-                        total_emission = year_row.iloc[0, 1]  # 두 번째 컬럼이 총배출량
-                        result_data.append({
-                            'year': year,
-                            'value': total_emission
-                        })
-                        print(f"📈 {year}년 총배출량: {total_emission:,.1f} (백만톤 CO₂)")
-                
-                result = pd.DataFrame(result_data)
+                # 연도별 비교: 각 연도의 총배출량 (요청 순서 유지)
+                by_year = emissions if emissions.index.is_unique else emissions[~emissions.index.duplicated()]
+                selected = by_year.reindex(intent.years).dropna()
+                if logger.isEnabledFor(logging.DEBUG):
+                    for year, total_emission in selected.items():
+                        logger.debug("📈 %s년 총배출량: %s (백만톤 CO₂)", year, f"{total_emission:,.1f}")
                         
             elif intent.query_type.value == 'trend':
                 # 추세 분석: 모든 연도의 총배출량
-                for _, row in inventory_dataset.iterrows():
-                    year = row.iloc[0]
-                    total_emission = row.iloc[1]
-                    if pd.notna(year) and pd.notna(total_emission):
-                        result_data.append({
-                            'year': int(year),
-                            'value': float(total_emission)
-                        })
-                
-                result = pd.DataFrame(result_data).sort_values('year')
+                selected = emissions.dropna().sort_index(kind='stable')
             else:
                 # 기본: 요청된 연도들의 데이터
-                for _, row in filtered_data.iterrows():
-                    year = row.iloc[0]
-                    total_emission = row.iloc[1]
-                    if pd.notna(year) and pd.notna(total_emission):
-                        result_data.append({
-                            'year': int(year),
-                            'value': float(total_emission)
-                        })
-                
-                result = pd.DataFrame(result_data)
+                selected = emissions.dropna()
+                if intent.years:
+                    selected = selected[selected.index.isin(intent.years)]
+                    logger.debug("📅 연도 필터링: %s → %d개 레코드", intent.years, len(selected))
+            
+            # 결과 배열을 목표 dtype으로 한 번에 만들고 추가 복사 없이 DataFrame 구성
+            result = pd.DataFrame({
+                'year': selected.index.to_numpy(dtype=np.int64),
+                'value': selected.to_numpy(dtype=np.float64),
+            }, copy=False)
             
             if result.empty:
                 return {"error": "요청한 연도의 데이터를 찾을 수 없습니다."}
@@ -272,9 +547,7 @@ class EnhancedCarbonRAGAgent:
             }
             
         except Exception as e:
-            print(f"기본 분석 오류: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.error("기본 분석 오류: %s", e, exc_info=logger.isEnabledFor(logging.DEBUG))
             return {"error": f"기본 분석 실패: {e}"}
     
     def _create_visualization(self, intent: QueryIntent, analysis_result: Dict[str, Any]) -> Optional[str]:
@@ -291,7 +564,7 @@ class EnhancedCarbonRAGAgent:
             # 차트 제목 생성
             title = self._generate_chart_title(intent)
             
-            # 시각화 생성
+            # 시각화 생성 (렌더링 직렬화는 VisualizationEngine이 담당)
             visualization = self.visualization_engine.create_visualization(
                 data=data,
                 chart_type=intent.chart_type.value,
@@ -302,64 +575,105 @@ class EnhancedCarbonRAGAgent:
             return visualization
             
         except Exception as e:
-            print(f"시각화 생성 오류: {e}")
+            logger.warning("시각화 생성 오류: %s", e)
             return None
     
     def _generate_chart_title(self, intent: QueryIntent) -> str:
         """차트 제목 생성"""
-        if intent.query_type.value == 'comparison' and intent.years:
-            if len(intent.years) == 2:
-                return f"{intent.years[0]}년과 {intent.years[1]}년 배출량 비교"
-            else:
-                return f"{min(intent.years)}-{max(intent.years)}년 배출량 비교"
-        elif intent.query_type.value == 'trend':
-            return "연도별 배출량 변화 추이"
-        elif intent.query_type.value == 'ranking':
-            return "분야별 배출량 순위"
-        else:
-            return "배출량 분석 결과"
+        builder = _TITLE_BUILDERS.get(intent.query_type.value, _default_title)
+        return builder(intent)
     
     def _generate_answer(self, question: str, intent: QueryIntent, analysis_result: Dict[str, Any]) -> str:
         """분석 결과를 바탕으로 자연어 답변 생성"""
+        cache_key = self._answer_cache_key(question, intent, analysis_result)
+        cached = self._get_cached_answer(cache_key)
+        if cached is not None:
+            return cached
+        
         try:
-            # 시스템 프롬프트
-            system_prompt = f"""
-당신은 온실가스 배출량 데이터 전문 분석가입니다.
-
-질문: {question}
-질문 타입: {intent.query_type.value}
-신뢰도: {intent.confidence:.2f}
-추출된 연도: {intent.years}
-관련 분야: {intent.entities}
-메트릭: {intent.metrics}
-
-분석 결과:
-{analysis_result.get('output', '분석 결과 없음')}
-
-위 정보를 바탕으로 다음 요구사항에 맞춰 답변해주세요:
-
-1. 질문에 직접적으로 답변
-2. 구체적인 수치 포함
-3. 간단한 해석 및 인사이트 제공
-4. 한국어로 친근하게 설명
-5. 3-5문장으로 간결하게 작성
-
-데이터 출처: 환경부, 한국거래소, 한국에너지공단 등 공공기관
-"""
-            
             # LLM으로 답변 생성
-            messages = [
-                SystemMessage(content=system_prompt),
-                HumanMessage(content=question)
-            ]
+            response = self.llm.invoke(self._build_answer_messages(question, intent, analysis_result))
+            self._store_cached_answer(cache_key, response.content)
+            return response.content
             
-            response = self.llm.invoke(messages)
+        except Exception as e:
+            # LLM 실패 시 기본 답변
+            return self._generate_fallback_answer(question, analysis_result)
+    
+    async def _agenerate_answer(self, question: str, intent: QueryIntent, analysis_result: Dict[str, Any]) -> str:
+        """_generate_answer의 비동기 버전 (LLM 호출을 await)"""
+        cache_key = self._answer_cache_key(question, intent, analysis_result)
+        cached = self._get_cached_answer(cache_key)
+        if cached is not None:
+            return cached
+        
+        try:
+            response = await self._ainvoke_with_retry(self._build_answer_messages(question, intent, analysis_result))
+            self._store_cached_answer(cache_key, response.content)
             return response.content
             
         except Exception as e:
             # LLM 실패 시 기본 답변
             return self._generate_fallback_answer(question, analysis_result)
     
+    @staticmethod
+    def _answer_cache_key(question: str, intent: QueryIntent, analysis_result: Dict[str, Any]) -> tuple:
+        """답변 캐시 키 - LLM에 전달되는 질문 원문, 질문 의도, 분석 결과 텍스트로 구성"""
+        return (
+            question.strip(),
+            intent.query_type.value,
+            tuple(intent.years),
+            tuple(intent.entities),
+            tuple(intent.metrics),
+            analysis_result.get('output'),
+            analysis_result.get('error'),
+        )
+    
+    def _get_cached_answer(self, key: tuple) -> Optional[str]:
+        """캐시된 답변 조회 (LRU 순서 갱신)"""
+        with self._answer_cache_lock:
+            answer = self._answer_cache.get(key)
+            if answer is not None:
+                self._answer_cache.move_to_end(key)
+            return answer
+    
+    def _store_cached_answer(self, key: tuple, answer: str, max_size: int = 512):
+        """LLM 답변 저장 (최대 크기 초과 시 가장 오래된 항목 제거)"""
+        with self._answer_cache_lock:
+            self._answer_cache[key] = answer
+            self._answer_cache.move_to_end(key)
+            while len(self._answer_cache) > max_size:
+                self._answer_cache.popitem(last=False)
+    
+    async def _ainvoke_with_retry(self, messages: list, max_retries: int = 3, base_delay: float = 0.5):
+        """429/5xx 응답 시 지수 백오프로 재시도하는 비동기 LLM 호출 (배치 중 일부 제한이 전체를 실패시키지 않도록)"""
+        for attempt in range(max_retries + 1):
+            try:
+                return await self.llm.ainvoke(messages)
+            except Exception as e:
+                status = getattr(e, 'status_code', None) or getattr(getattr(e, 'response', None), 'status_code', None)
+                retryable = status == 429 or (isinstance(status, int) and status >= 500)
+                if not retryable or attempt == max_retries:
+                    raise
+                await asyncio.sleep(base_delay * (2 ** attempt))
+    
+    def _build_answer_messages(self, question: str, intent: QueryIntent, analysis_result: Dict[str, Any]) -> list:
+        """답변 생성용 LLM 메시지 구성"""
+        # 시스템 프롬프트 (질문은 HumanMessage로 전달되므로 중복 포함하지 않음)
+        system_prompt = _SYSTEM_PROMPT_PREFIX + _SYSTEM_PROMPT_CONTEXT.format_map({
+            'query_type': intent.query_type.value,
+            'confidence': intent.confidence,
+            'years': intent.years,
+            'entities': intent.entities,
+            'metrics': intent.metrics,
+            'output': analysis_result.get('output', '분석 결과 없음'),
+        })
+        
+        return [
+            SystemMessage(content=system_prompt),
+            HumanMessage(content=question)
+        ]
+    
     def _generate_fallback_answer(self, question: str, analysis_result: Dict[str, Any]) -> str:
         """기본 답변 생성 (LLM 실패 시)"""
         if analysis_result.get("error"):
@@ -383,32 +697,39 @@ class EnhancedCarbonRAGAgent:
     
     def get_available_data_info(self) -> str:
         """사용 가능한 데이터 정보 반환"""
-        info_parts = ["📊 **사용 가능한 데이터:**\n"]
+        return self._data_info_str
+    
+    @cached_property
+    def _data_info_str(self) -> str:
+        """데이터 정보 문자열 (데이터셋은 로드 후 바뀌지 않으므로 한 번만 생성)"""
+        return "\n".join(self._iter_info_lines())
+    
+    def _iter_info_lines(self):
+        """데이터 정보 문자열의 각 줄을 생성"""
+        yield "📊 **사용 가능한 데이터:**\n"
         
         for name, info in self.dataset_info.items():
-            info_parts.append(f"**{name}**")
-            info_parts.append(f"- {info.description}")
-            info_parts.append(f"- 크기: {info.shape[0]}행 × {info.shape[1]}열")
+            yield f"**{name}**"
+            yield f"- {info.description}"
+            yield f"- 크기: {info.shape[0]}행 × {info.shape[1]}열"
             if info.has_year_columns:
                 years = [str(col) for col in info.year_columns[:5]]  # 처음 5개만
-                info_parts.append(f"- 연도: {', '.join(years)}...")
-            info_parts.append("")
+                yield f"- 연도: {', '.join(years)}..."
+            yield ""
         
         # 통합 데이터 정보
         if self.unified_data is not None:
-            info_parts.append("**📈 통합 분석 데이터:**")
-            info_parts.append(f"- 전체 레코드: {len(self.unified_data):,}개")
-            info_parts.append(f"- 연도 범위: {self.data_summary['year_range']}")
-            info_parts.append(f"- 데이터셋 수: {self.data_summary['datasets_in_unified']}개")
-        
-        return "\n".join(info_parts)
+            yield "**📈 통합 분석 데이터:**"
+            yield f"- 전체 레코드: {len(self.unified_data):,}개"
+            yield f"- 연도 범위: {self.data_summary['year_range']}"
+            yield f"- 데이터셋 수: {self.data_summary['datasets_in_unified']}개"
     
     def get_system_status(self) -> Dict[str, Any]:
         """시스템 상태 정보 반환"""
         return {
             "datasets_loaded": len(self.dataset_info),
             "unified_data_size": len(self.unified_data) if self.unified_data is not None else 0,
-            "metadata_available": len(self.metadata_manager.metadata),
+            "metadata_available": len(self.metadata),
             "execution_history": self.code_executor.get_execution_summary(),
             "data_summary": self.data_summary
         }
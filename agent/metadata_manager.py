@@ -5,13 +5,36 @@
 
 import json
 import pandas as pd
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass, asdict
 from pathlib import Path
 import hashlib
 from datetime import datetime
+from functools import lru_cache
+from collections import defaultdict
+from collections.abc import MutableMapping
+try:
+    import orjson
+except ImportError:  # orjson 미설치 시 표준 json 모듈 사용
+    orjson = None
+try:
+    import msgpack
+except ImportError:  # msgpack 미설치 시 .msgpack 경로도 JSON으로 저장
+    msgpack = None
 
-@dataclass
+def _frame_hash(df: pd.DataFrame) -> str:
+    """데이터프레임 내용 해시 - pandas의 C 구현 행 해시(uint64 배열)를 하나의 다이제스트로 접음
+
+    .values 업캐스트나 문자열 변환 없이 컬럼 버퍼를 직접 해시하므로 혼합 dtype에서도 안정적임
+    """
+    h = hashlib.blake2b(digest_size=16)
+    # 행 해시에는 컬럼명이 포함되지 않으므로 형태와 컬럼명을 함께 반영
+    h.update(repr((df.shape, list(map(str, df.columns)))).encode())
+    row_hashes = pd.util.hash_pandas_object(df, index=False, categorize=False).to_numpy()
+    h.update(row_hashes.tobytes())
+    return h.hexdigest()
+
+@dataclass(slots=True)
 class ColumnMetadata:
     """컬럼 메타데이터"""
     name: str
@@ -25,7 +48,7 @@ class ColumnMetadata:
     min_value: Optional[float] = None
     max_value: Optional[float] = None
 
-@dataclass
+@dataclass(slots=True)
 class DatasetMetadata:
     """데이터셋 메타데이터"""
     name: str
@@ -40,6 +63,65 @@ class DatasetMetadata:
     quality_score: float
     tags: List[str]
 
+def _build_dataset_metadata(data: Dict[str, Any]) -> DatasetMetadata:
+    """파일에서 읽은 dict를 DatasetMetadata 객체로 복원"""
+    data = dict(data)
+    data['columns'] = [ColumnMetadata(**col_data) for col_data in data['columns']]
+    return DatasetMetadata(**data)
+
+def _col_attr(col: Any, key: str) -> Any:
+    """컬럼 메타데이터(dict 또는 ColumnMetadata)에서 필드 값 읽기"""
+    return col[key] if isinstance(col, dict) else getattr(col, key)
+
+class _LazyMetadata(MutableMapping):
+    """파일에서 읽은 원본 dict를 보관하다가 데이터셋별 첫 접근 시 DatasetMetadata로 변환하는 매핑"""
+    
+    def __init__(self, raw: Optional[Dict[str, Dict[str, Any]]] = None):
+        # 값은 아직 변환되지 않은 dict 또는 변환된 DatasetMetadata (삽입 순서 유지)
+        self._entries: Dict[str, Any] = dict(raw or {})
+    
+    def __getitem__(self, name: str) -> DatasetMetadata:
+        entry = self._entries[name]
+        if isinstance(entry, dict):
+            entry = self._entries[name] = _build_dataset_metadata(entry)
+        return entry
+    
+    def __setitem__(self, name: str, metadata: DatasetMetadata) -> None:
+        self._entries[name] = metadata
+    
+    def __delitem__(self, name: str) -> None:
+        del self._entries[name]
+    
+    def __iter__(self):
+        return iter(self._entries)
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def __contains__(self, name: object) -> bool:
+        return name in self._entries
+    
+    def peek(self, name: str, field: str) -> Any:
+        """데이터셋을 변환하지 않고 필드 값만 읽기 (columns는 dict 또는 ColumnMetadata 목록)"""
+        entry = self._entries[name]
+        return entry[field] if isinstance(entry, dict) else getattr(entry, field)
+    
+    def set_field(self, name: str, field: str, value: Any) -> None:
+        """데이터셋을 변환하지 않고 필드 값 갱신"""
+        entry = self._entries[name]
+        if isinstance(entry, dict):
+            entry[field] = value
+        else:
+            setattr(entry, field, value)
+    
+    def update_raw(self, raw: Dict[str, Dict[str, Any]]) -> None:
+        """변환 전 dict 상태의 데이터셋 메타데이터 추가"""
+        self._entries.update(raw)
+    
+    def raw_items(self):
+        """(이름, dict 또는 DatasetMetadata) 쌍 - 저장 시 변환 없이 직렬화하기 위해 사용"""
+        return self._entries.items()
+
 class MetadataManager:
     """데이터 메타정보 관리 클래스"""
     
@@ -51,9 +133,17 @@ class MetadataManager:
             metadata_file: 메타데이터 저장 파일 경로
         """
         self.metadata_file = Path(metadata_file)
-        self.metadata: Dict[str, DatasetMetadata] = {}
+        # 파일에서 읽은 데이터셋은 처음 조회될 때 DatasetMetadata로 변환
+        self.metadata: _LazyMetadata = _LazyMetadata()
         self.column_mappings: Dict[str, Dict[str, str]] = {}
         
+        # 데이터셋별 소문자 컬럼명 집합 캐시 (메타데이터가 바뀔 때 갱신)
+        self._lower_cols_cache: Dict[str, frozenset] = {}
+        
+        # 태그 -> 데이터셋, 카테고리 -> 데이터셋 -> 컬럼 역색인 (첫 검색 시 생성, 메타데이터가 바뀌면 폐기)
+        self._tag_index: Optional[Dict[str, List[str]]] = None
+        self._category_index: Optional[Dict[str, Dict[str, List[str]]]] = None
+        
         # 기본 메타데이터 템플릿
         self.default_metadata = self._create_default_metadata()
         
@@ -127,6 +217,8 @@ class MetadataManager:
             if name not in self.metadata:
                 metadata = self._analyze_dataset(name, df)
                 self.metadata[name] = metadata
+                self._lower_cols_cache[name] = self._lower_columns_of(metadata.columns)
+        self._invalidate_search_indexes()
         
         # 데이터셋 간 관계 분석
         self._analyze_relationships()
@@ -137,19 +229,47 @@ class MetadataManager:
     def _analyze_dataset(self, name: str, df: pd.DataFrame) -> DatasetMetadata:
         """개별 데이터셋 분석하여 메타데이터 생성"""
         # 파일 해시 계산
-        file_hash = hashlib.md5(str(df.values.tobytes()).encode()).hexdigest()
+        file_hash = _frame_hash(df)
+        
+        # 컬럼 메타데이터 생성 (통계는 컬럼별 반복 대신 데이터프레임 단위로 한 번에 계산)
+        dtypes = list(df.dtypes)
+        numeric_flags = [pd.api.types.is_numeric_dtype(dtype) for dtype in dtypes]
+        numeric_pos = [i for i, flag in enumerate(numeric_flags) if flag]
+        other_pos = [i for i, flag in enumerate(numeric_flags) if not flag]
+        
+        # 컬럼별 결측 아닌 값 개수 (전체 결측 마스크 없이 한 번에 계산, 품질 점수에도 재사용)
+        non_na_counts = df.count().to_numpy()
+        
+        mins, maxs = {}, {}
+        if numeric_pos:
+            numeric_df = df.iloc[:, numeric_pos]
+            mins = dict(zip(numeric_pos, numeric_df.min().tolist()))
+            maxs = dict(zip(numeric_pos, numeric_df.max().tolist()))
+        # 범주형 후보 컬럼의 고유값은 앞부분 표본으로만 판단 (매우 큰 컬럼에서는 possible_values가 근사치)
+        sample = df.iloc[:self._POSSIBLE_VALUES_SAMPLE, other_pos] if other_pos else None
+        nuniques = dict(zip(other_pos, sample.nunique().tolist())) if other_pos else {}
         
-        # 컬럼 메타데이터 생성
         columns_metadata = []
-        for col in df.columns:
-            col_meta = self._analyze_column(col, df[col])
-            columns_metadata.append(col_meta)
+        for i, col in enumerate(df.columns):
+            is_numeric = numeric_flags[i]
+            min_value = max_value = None
+            possible_values = None
+            if is_numeric:
+                if non_na_counts[i] > 0:
+                    min_value, max_value = float(mins[i]), float(maxs[i])
+            elif nuniques[i] < 50:
+                column = df.iloc[:self._POSSIBLE_VALUES_SAMPLE, i]
+                possible_values = column.drop_duplicates().head(20).tolist()  # 최대 20개
+            columns_metadata.append(self._analyze_column(
+                col, str(dtypes[i]), is_numeric, possible_values, min_value, max_value
+            ))
         
         # 기본 메타데이터 가져오기
         default_info = self.default_metadata.get(name, {})
         
         # 품질 점수 계산
-        quality_score = self._calculate_quality_score(df)
+        na_count = df.shape[0] * df.shape[1] - non_na_counts.sum()
+        quality_score = self._calculate_quality_score(df.shape, na_count)
         
         return DatasetMetadata(
             name=name,
@@ -165,12 +285,11 @@ class MetadataManager:
             tags=default_info.get("tags", ["온실가스"])
         )
     
-    def _analyze_column(self, col_name: str, series: pd.Series) -> ColumnMetadata:
-        """개별 컬럼 분석"""
-        # 데이터 타입 결정
-        dtype = str(series.dtype)
-        is_numeric = pd.api.types.is_numeric_dtype(series)
-        
+    def _analyze_column(self, col_name: str, dtype: str, is_numeric: bool,
+                        possible_values: Optional[List[Any]] = None,
+                        min_value: Optional[float] = None,
+                        max_value: Optional[float] = None) -> ColumnMetadata:
+        """개별 컬럼 분석 (값 통계는 _analyze_dataset에서 미리 계산해 전달)"""
         # 카테고리 결정
         category = self._determine_column_category(col_name)
         
@@ -180,18 +299,6 @@ class MetadataManager:
         # 단위 결정
         unit = self._determine_unit(col_name, category)
         
-        # 가능한 값들 (카테고리형인 경우)
-        possible_values = None
-        if not is_numeric and series.nunique() < 50:
-            possible_values = series.unique().tolist()[:20]  # 최대 20개
-        
-        # 최솟값, 최댓값 (숫자형인 경우)
-        min_value = None
-        max_value = None
-        if is_numeric:
-            min_value = float(series.min()) if not series.isna().all() else None
-            max_value = float(series.max()) if not series.isna().all() else None
-        
         return ColumnMetadata(
             name=col_name,
             description=description,
@@ -205,50 +312,62 @@ class MetadataManager:
             max_value=max_value
         )
     
-    def _determine_column_category(self, col_name: str) -> str:
+    # 컬럼명 키워드 -> 카테고리 (위에서부터 먼저 매칭되는 카테고리 사용)
+    _CATEGORY_KEYWORDS = (
+        ("시간", ('년', 'year', '연도')),
+        ("배출량", ('배출량', '배출', 'emission')),
+        ("할당량", ('할당량', '할당', 'allocation')),
+        ("거래량", ('거래량', '거래', 'trade')),
+        ("기업정보", ('업체', '기업', '회사', 'company')),
+        ("산업분류", ('업종', '산업', 'industry')),
+        ("지역정보", ('지역', '시도', 'region')),
+        ("분야분류", ('분야', '부문', 'sector')),
+    )
+    
+    _CATEGORY_DESCRIPTIONS = {
+        "시간": "{} (연도 정보)",
+        "배출량": "{} (온실가스 배출량)",
+        "할당량": "{} (배출권 할당량)",
+        "거래량": "{} (배출권 거래량)",
+        "기업정보": "{} (기업/업체 정보)",
+        "산업분류": "{} (산업/업종 분류)",
+        "지역정보": "{} (지역 정보)",
+        "분야분류": "{} (분야/부문 분류)",
+        "기타": "{}",
+    }
+    
+    _KEY_INDICATORS = ('id', '코드', '업체명', '기업명', '사업명', '년', '연도')
+    
+    # possible_values 판단에 사용할 최대 행 수
+    _POSSIBLE_VALUES_SAMPLE = 200_000
+    
+    # 아래 판별 함수들은 컬럼명만으로 결정되므로 데이터셋 간 반복되는 컬럼명은 캐시에서 바로 반환
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _determine_column_category(col_name: str) -> str:
         """컬럼 카테고리 결정"""
         col_lower = str(col_name).lower()
         
-        if any(word in col_lower for word in ['년', 'year', '연도']):
-            return "시간"
-        elif any(word in col_lower for word in ['배출량', '배출', 'emission']):
-            return "배출량"
-        elif any(word in col_lower for word in ['할당량', '할당', 'allocation']):
-            return "할당량"
-        elif any(word in col_lower for word in ['거래량', '거래', 'trade']):
-            return "거래량"
-        elif any(word in col_lower for word in ['업체', '기업', '회사', 'company']):
-            return "기업정보"
-        elif any(word in col_lower for word in ['업종', '산업', 'industry']):
-            return "산업분류"
-        elif any(word in col_lower for word in ['지역', '시도', 'region']):
-            return "지역정보"
-        elif any(word in col_lower for word in ['분야', '부문', 'sector']):
-            return "분야분류"
-        else:
-            return "기타"
+        for category, keywords in MetadataManager._CATEGORY_KEYWORDS:
+            if any(word in col_lower for word in keywords):
+                return category
+        return "기타"
     
-    def _generate_column_description(self, col_name: str, category: str) -> str:
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _generate_column_description(col_name: str, category: str) -> str:
         """컬럼 설명 생성"""
-        descriptions = {
-            "시간": f"{col_name} (연도 정보)",
-            "배출량": f"{col_name} (온실가스 배출량)",
-            "할당량": f"{col_name} (배출권 할당량)",
-            "거래량": f"{col_name} (배출권 거래량)",
-            "기업정보": f"{col_name} (기업/업체 정보)",
-            "산업분류": f"{col_name} (산업/업종 분류)",
-            "지역정보": f"{col_name} (지역 정보)",
-            "분야분류": f"{col_name} (분야/부문 분류)",
-            "기타": f"{col_name}"
-        }
-        return descriptions.get(category, col_name)
+        template = MetadataManager._CATEGORY_DESCRIPTIONS.get(category)
+        return template.format(col_name) if template else col_name
     
-    def _determine_unit(self, col_name: str, category: str) -> Optional[str]:
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _determine_unit(col_name: str, category: str) -> Optional[str]:
         """컬럼 단위 결정"""
         col_lower = str(col_name).lower()
         
-        if category in ["배출량", "할당량", "거래량"]:
-            if any(word in col_lower for word in ['mt', '백만톤', 'million']):
+        if category in ("배출량", "할당량", "거래량"):
+            if any(word in col_lower for word in ('mt', '백만톤', 'million')):
                 return "MtCO2eq"
             else:
                 return "tCO2eq"
@@ -259,18 +378,19 @@ class MetadataManager:
         else:
             return None
     
-    def _is_key_column(self, col_name: str) -> bool:
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _is_key_column(col_name: str) -> bool:
         """키 컬럼 여부 판단"""
-        key_indicators = ['id', '코드', '업체명', '기업명', '사업명', '년', '연도']
         col_lower = str(col_name).lower()
-        return any(indicator in col_lower for indicator in key_indicators)
+        return any(indicator in col_lower for indicator in MetadataManager._KEY_INDICATORS)
     
-    def _calculate_quality_score(self, df: pd.DataFrame) -> float:
-        """데이터 품질 점수 계산 (0-1)"""
+    def _calculate_quality_score(self, shape: Tuple[int, int], na_count: int) -> float:
+        """데이터 품질 점수 계산 (0-1) - shape와 결측값 개수는 _analyze_dataset에서 계산해 전달"""
         score = 0.0
         
         # 완성도 (결측값 비율)
-        completeness = 1 - (df.isnull().sum().sum() / (df.shape[0] * df.shape[1]))
+        completeness = 1 - (na_count / (shape[0] * shape[1]))
         score += completeness * 0.4
         
         # 일관성 (데이터 타입 일관성)
@@ -284,31 +404,49 @@ class MetadataManager:
         return min(score, 1.0)
     
     def _analyze_relationships(self) -> None:
-        """데이터셋 간 관계 분석"""
-        dataset_names = list(self.metadata.keys())
+        """데이터셋 간 관계 분석 (컬럼명 -> 데이터셋 역색인으로 공통 컬럼을 한 번에 계산)"""
+        dataset_order = {name: i for i, name in enumerate(self.metadata)}
         
-        for name1 in dataset_names:
-            relationships = {}
-            
-            for name2 in dataset_names:
-                if name1 != name2:
-                    # 공통 컬럼 찾기
-                    common_columns = self._find_common_columns(name1, name2)
-                    if common_columns:
-                        relationships[name2] = common_columns
-            
-            self.metadata[name1].relationships = relationships
+        col_to_datasets: Dict[str, List[str]] = defaultdict(list)
+        for name in self.metadata:
+            columns = self.metadata.peek(name, 'columns')
+            for col_name in dict.fromkeys(str(_col_attr(col, 'name')).lower() for col in columns):
+                col_to_datasets[col_name].append(name)
+        
+        relationships: Dict[str, Dict[str, List[str]]] = defaultdict(lambda: defaultdict(list))
+        for col_name, names in col_to_datasets.items():
+            if len(names) < 2:
+                continue
+            for name1 in names:
+                for name2 in names:
+                    if name1 != name2:
+                        relationships[name1][name2].append(col_name)
+        
+        for name in self.metadata:
+            related = relationships.get(name, {})
+            self.metadata.set_field(name, 'relationships', {
+                other: related[other] for other in sorted(related, key=dataset_order.__getitem__)
+            })
     
     def _find_common_columns(self, dataset1: str, dataset2: str) -> List[str]:
         """두 데이터셋 간 공통 컬럼 찾기"""
         if dataset1 not in self.metadata or dataset2 not in self.metadata:
             return []
         
-        cols1 = {str(col.name).lower() for col in self.metadata[dataset1].columns}
-        cols2 = {str(col.name).lower() for col in self.metadata[dataset2].columns}
-        
-        common = cols1.intersection(cols2)
-        return list(common)
+        return list(self._lower_columns(dataset1) & self._lower_columns(dataset2))
+    
+    def _lower_columns(self, dataset_name: str) -> frozenset:
+        """데이터셋의 소문자 컬럼명 집합 (캐시)"""
+        cols = self._lower_cols_cache.get(dataset_name)
+        if cols is None:
+            cols = self._lower_columns_of(self.metadata.peek(dataset_name, 'columns'))
+            self._lower_cols_cache[dataset_name] = cols
+        return cols
+    
+    @staticmethod
+    def _lower_columns_of(columns: List[Any]) -> frozenset:
+        """컬럼 메타데이터 목록의 컬럼명을 소문자 집합으로 변환"""
+        return frozenset(str(_col_attr(col, 'name')).lower() for col in columns)
     
     def get_dataset_info(self, dataset_name: str) -> Optional[Dict[str, Any]]:
         """데이터셋 정보 조회"""
@@ -326,20 +464,33 @@ class MetadataManager:
     
     def search_datasets_by_tag(self, tag: str) -> List[str]:
         """태그로 데이터셋 검색"""
-        matching_datasets = []
-        for name, metadata in self.metadata.items():
-            if tag.lower() in [t.lower() for t in metadata.tags]:
-                matching_datasets.append(name)
-        return matching_datasets
+        if self._tag_index is None:
+            self._build_search_indexes()
+        return list(self._tag_index.get(tag.lower(), ()))
     
     def search_columns_by_category(self, category: str) -> Dict[str, List[str]]:
         """카테고리로 컬럼 검색"""
-        matching_columns = {}
-        for dataset_name, metadata in self.metadata.items():
-            cols = [col.name for col in metadata.columns if col.category == category]
-            if cols:
-                matching_columns[dataset_name] = cols
-        return matching_columns
+        if self._category_index is None:
+            self._build_search_indexes()
+        matching = self._category_index.get(category, {})
+        return {dataset_name: list(cols) for dataset_name, cols in matching.items()}
+    
+    def _build_search_indexes(self) -> None:
+        """태그/카테고리 역색인 생성 (데이터셋 순서와 컬럼 순서 유지)"""
+        tag_index: Dict[str, List[str]] = defaultdict(list)
+        category_index: Dict[str, Dict[str, List[str]]] = defaultdict(dict)
+        for name in self.metadata:
+            for tag in dict.fromkeys(t.lower() for t in self.metadata.peek(name, 'tags')):
+                tag_index[tag].append(name)
+            for col in self.metadata.peek(name, 'columns'):
+                category_index[_col_attr(col, 'category')].setdefault(name, []).append(_col_attr(col, 'name'))
+        self._tag_index = dict(tag_index)
+        self._category_index = dict(category_index)
+    
+    def _invalidate_search_indexes(self) -> None:
+        """메타데이터 변경 후 검색 역색인 폐기"""
+        self._tag_index = None
+        self._category_index = None
     
     def get_data_lineage(self, dataset_name: str) -> Dict[str, Any]:
         """데이터 계보 정보 조회"""
@@ -356,57 +507,78 @@ class MetadataManager:
         }
     
     def save_metadata(self) -> None:
-        """메타데이터를 파일에 저장"""
-        metadata_dict = {}
-        for name, metadata in self.metadata.items():
-            metadata_dict[name] = asdict(metadata)
+        """메타데이터를 파일에 저장 (.msgpack 경로는 바이너리, 그 외는 사람이 읽을 수 있는 JSON)"""
+        if self.metadata_file.suffix == '.msgpack' and msgpack is not None:
+            payload = msgpack.packb(self._serializable_metadata(), use_bin_type=True)
+        elif orjson is not None:
+            # orjson은 dataclass를 직접 직렬화하므로 asdict() 깊은 복사가 필요 없음 (변환 전 dict는 그대로 직렬화)
+            payload = orjson.dumps(
+                dict(self.metadata.raw_items()),
+                option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+            )
+        else:
+            payload = json.dumps(self._serializable_metadata(), ensure_ascii=False, indent=2).encode('utf-8')
         
-        with open(self.metadata_file, 'w', encoding='utf-8') as f:
-            json.dump(metadata_dict, f, ensure_ascii=False, indent=2)
+        # 메모리에서 직렬화를 끝낸 뒤 임시 파일에 한 번에 쓰고 교체 (쓰는 도중 중단돼도 기존 파일 유지)
+        tmp_file = self.metadata_file.with_name(self.metadata_file.name + '.tmp')
+        tmp_file.write_bytes(payload)
+        tmp_file.replace(self.metadata_file)
     
     def load_metadata(self) -> None:
         """파일에서 메타데이터 로드"""
+        self._lower_cols_cache.clear()
+        self._invalidate_search_indexes()
         if self.metadata_file.exists():
             try:
-                with open(self.metadata_file, 'r', encoding='utf-8') as f:
-                    metadata_dict = json.load(f)
-                
-                for name, data in metadata_dict.items():
-                    # ColumnMetadata 객체들 복원
-                    columns = [ColumnMetadata(**col_data) for col_data in data['columns']]
-                    data['columns'] = columns
-                    
-                    # DatasetMetadata 객체 생성
-                    self.metadata[name] = DatasetMetadata(**data)
+                # 파싱만 하고 DatasetMetadata/ColumnMetadata 객체는 데이터셋별 첫 조회 시 생성
+                self.metadata.update_raw(self._read_metadata_file())
                     
-            except (json.JSONDecodeError, KeyError) as e:
+            except (json.JSONDecodeError, ValueError, KeyError) as e:
                 print(f"메타데이터 로드 실패: {e}")
-                self.metadata = {}
+                self.metadata = _LazyMetadata()
+    
+    def _serializable_metadata(self) -> Dict[str, Dict[str, Any]]:
+        """저장용 dict (아직 변환되지 않은 데이터셋은 읽은 dict 그대로 사용)"""
+        return {
+            name: entry if isinstance(entry, dict) else asdict(entry)
+            for name, entry in self.metadata.raw_items()
+        }
+    
+    def _read_metadata_file(self) -> Dict[str, Any]:
+        """메타데이터 파일을 dict로 읽기"""
+        raw = self.metadata_file.read_bytes()
+        if self.metadata_file.suffix == '.msgpack' and msgpack is not None:
+            return msgpack.unpackb(raw, raw=False)
+        if orjson is not None:
+            try:
+                return orjson.loads(raw)
+            except orjson.JSONDecodeError:
+                pass  # 표준 json으로 저장된 NaN 등은 orjson이 읽지 못하므로 아래에서 재시도
+        return json.loads(raw.decode('utf-8'))
     
     def generate_data_catalog(self) -> str:
         """데이터 카탈로그 생성"""
-        catalog = "# 데이터 카탈로그\n\n"
+        parts: List[str] = ["# 데이터 카탈로그\n\n"]
         
         for name, metadata in self.metadata.items():
-            catalog += f"## {name}\n"
-            catalog += f"**설명**: {metadata.description}\n"
-            catalog += f"**출처**: {metadata.source}\n"
-            catalog += f"**크기**: {metadata.shape[0]}행 × {metadata.shape[1]}열\n"
-            catalog += f"**품질점수**: {metadata.quality_score:.2f}\n"
-            catalog += f"**태그**: {', '.join(metadata.tags)}\n\n"
-            
-            catalog += "### 컬럼 정보\n"
+            parts.append(
+                f"## {name}\n"
+                f"**설명**: {metadata.description}\n"
+                f"**출처**: {metadata.source}\n"
+                f"**크기**: {metadata.shape[0]}행 × {metadata.shape[1]}열\n"
+                f"**품질점수**: {metadata.quality_score:.2f}\n"
+                f"**태그**: {', '.join(metadata.tags)}\n\n"
+                "### 컬럼 정보\n"
+            )
             for col in metadata.columns:
-                catalog += f"- **{col.name}** ({col.category}): {col.description}"
-                if col.unit:
-                    catalog += f" [{col.unit}]"
-                catalog += "\n"
+                unit = f" [{col.unit}]" if col.unit else ""
+                parts.append(f"- **{col.name}** ({col.category}): {col.description}{unit}\n")
             
             if metadata.relationships:
-                catalog += "\n### 관련 데이터셋\n"
+                parts.append("\n### 관련 데이터셋\n")
                 for related, common_cols in metadata.relationships.items():
-                    catalog += f"- {related}: 공통 컬럼 {', '.join(common_cols)}\n"
+                    parts.append(f"- {related}: 공통 컬럼 {', '.join(common_cols)}\n")
             
-            catalog += "\n---\n\n"
+            parts.append("\n---\n\n")
         
-        return catalog 
\ No newline at end of file
+        return "".join(parts) 
\ No newline at end of file
@@ -3,11 +3,47 @@
 사용자 질문을 분석해서 의도를 파악하는 NLP 모듈
 """
 
+import logging
 import re
+import unicodedata
 from typing import Dict, List, Tuple, Optional, Any
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
+from functools import lru_cache
 from enum import Enum
 import pandas as pd
+try:
+    import ahocorasick
+except ImportError:  # pyahocorasick 미설치 시 키워드 목록별 부분 문자열 검사로 처리
+    ahocorasick = None
+
+logger = logging.getLogger(__name__)
+
+# 정규식은 모듈 로드 시 한 번만 컴파일
+_YEAR_RE = re.compile(r'(\d{4})')
+_SPECIFIC_VALUE_RE = re.compile(r'얼마|몇|수치|값|량')
+
+# "A와 B 비교" 형태의 비교 항목 패턴 (패턴별 결과 순서를 유지하기 위해 개별 컴파일)
+_COMPARISON_ITEM_RES = tuple(re.compile(p) for p in (
+    r'(\w+)와\s*(\w+)',
+    r'(\w+)과\s*(\w+)',
+    r'(\w+)\s*vs\s*(\w+)',
+    r'(\w+)\s*대비\s*(\w+)',
+))
+
+# 시각화 필요 여부 판단용 패턴 (매칭 여부만 보므로 그룹별로 하나의 정규식으로 결합)
+_VIZ_COMPARISON_RE = re.compile('|'.join(f'(?:{p})' for p in (
+    r'(\d{4})년.*(\d{4})년.*비교',
+    r'비교.*(\d{4})년.*(\d{4})년',
+    r'(\d{4}).*vs.*(\d{4})',
+    r'(\d{4}).*대비.*(\d{4})',
+    r'차이.*(\d{4}).*(\d{4})',
+)))
+_VIZ_TREND_RE = re.compile(r'추이|변화|트렌드|경향|증가|감소|변동')
+_VIZ_RANKING_RE = re.compile(r'순위|랭킹|많은|적은|최대|최소|상위|하위')
+
+def _normalize_text(text: str) -> str:
+    """키워드 매칭용 정규화 (NFKC + 소문자) - 전각/호환 문자와 대소문자 차이를 흡수"""
+    return unicodedata.normalize('NFKC', text).lower()
 
 class QueryType(Enum):
     """질문 타입 열거형"""
@@ -32,7 +68,7 @@ class ChartType(Enum):
     BOX = "box"  # 박스플롯
     AREA = "area"  # 영역 차트
 
-@dataclass
+@dataclass(slots=True)
 class QueryIntent:
     """질문 의도 분석 결과"""
     query_type: QueryType
@@ -48,9 +84,26 @@ class QueryIntent:
 class QueryAnalyzer:
     """질문 의도 분석 및 분류 클래스"""
     
+    # 질문 타입 판별 우선순위 (비교 > 추세 > 순위 > 통계 > 상관관계)
+    _QUERY_TYPE_PRIORITY = (
+        ('comparison', QueryType.COMPARISON),
+        ('trend', QueryType.TREND),
+        ('ranking', QueryType.RANKING),
+        ('statistics', QueryType.STATISTICS),
+        ('correlation', QueryType.CORRELATION),
+    )
+    
+    # 집계 방법 키워드 (평균 > 합계 > 최대 > 최소 순으로 판별)
+    _AGGREGATION_KEYWORDS = (
+        ('mean', ('평균', 'average', 'avg')),
+        ('sum', ('총', '합계', '전체', 'total', 'sum')),
+        ('max', ('최대', '최고', 'max', 'maximum')),
+        ('min', ('최소', '최저', 'min', 'minimum')),
+    )
+    
     def __init__(self):
         """쿼리 분석기 초기화"""
-        self.year_pattern = r'(\d{4})'
+        self.year_pattern = _YEAR_RE.pattern
         self.comparison_keywords = [
             '비교', '차이', '대비', 'vs', '와', '과', '보다', '대조',
             '비교해', '차이점', '차이는', '비교하면'
@@ -89,25 +142,111 @@ class QueryAnalyzer:
             '거래량': ['거래량', '거래', '매매'],
             '감축량': ['감축량', '감축', '절약', '저감']
         }
+        
+        # 시각화 요청 키워드
+        self.chart_keywords = [
+            '그래프', '차트', '그려줘', '그려주세요', '시각화', 
+            '막대그래프', '선그래프', '파이차트', '도표', '도식',
+            '보여줘', '보여주세요', '그림', '차트로', '그래프로',
+            '표현해줘', '표현해주세요', '비교해줘', '비교해주세요'
+        ]
+        
+        self._build_keyword_matcher()
+        
+        # 분석 결과는 질문 문자열과 고정된 키워드 테이블에만 의존하므로 질문 단위로 캐시
+        self._analyze_query_cached = lru_cache(maxsize=1024)(self._analyze_query)
+        self._needs_visualization_cached = lru_cache(maxsize=1024)(self._needs_visualization)
+    
+    def clear_cache(self):
+        """질문 분석 캐시 비우기 (키워드 테이블을 바꾼 뒤 호출)"""
+        self._analyze_query_cached.cache_clear()
+        self._needs_visualization_cached.cache_clear()
+    
+    def _build_keyword_matcher(self):
+        """모든 키워드 목록을 버킷 이름과 함께 묶어 질문 한 번 스캔으로 분류할 수 있게 준비"""
+        keyword_buckets: List[Tuple[str, List[str]]] = [
+            ('comparison', self.comparison_keywords),
+            ('trend', self.trend_keywords),
+            ('ranking', self.ranking_keywords),
+            ('statistics', self.statistics_keywords),
+            ('correlation', self.correlation_keywords),
+            ('chart', self.chart_keywords),
+        ]
+        keyword_buckets += [(f'sector:{name}', kws) for name, kws in self.sector_keywords.items()]
+        keyword_buckets += [(f'metric:{name}', kws) for name, kws in self.metric_keywords.items()]
+        keyword_buckets += [(f'agg:{agg}', list(kws)) for agg, kws in self._AGGREGATION_KEYWORDS]
+        
+        # 키워드는 질문과 같은 방식으로 한 번만 정규화 ('CO2', 'GHG' 등 대문자 키워드도 매칭되도록)
+        self._keyword_buckets: List[Tuple[str, List[str]]] = [
+            (bucket, list(dict.fromkeys(_normalize_text(kw) for kw in keywords)))
+            for bucket, keywords in keyword_buckets
+        ]
+        self._chart_keywords_norm = dict(self._keyword_buckets)['chart']
+        
+        self._automaton = None
+        if ahocorasick is not None:
+            # 같은 키워드가 여러 버킷에 속할 수 있으므로 키워드 -> 버킷 목록
+            keyword_to_buckets: Dict[str, List[str]] = {}
+            for bucket, keywords in self._keyword_buckets:
+                for keyword in keywords:
+                    keyword_to_buckets.setdefault(keyword, []).append(bucket)
+            automaton = ahocorasick.Automaton()
+            for keyword, buckets in keyword_to_buckets.items():
+                automaton.add_word(keyword, (keyword, tuple(buckets)))
+            automaton.make_automaton()
+            self._automaton = automaton
+    
+    def _scan_keywords(self, query_norm: str) -> Dict[str, List[str]]:
+        """정규화된 질문에서 발견된 키워드를 버킷별로 반환 (Aho-Corasick 사용 시 질문을 한 번만 스캔)"""
+        hits: Dict[str, List[str]] = {}
+        if self._automaton is not None:
+            for _, (keyword, buckets) in self._automaton.iter(query_norm):
+                for bucket in buckets:
+                    found = hits.setdefault(bucket, [])
+                    if keyword not in found:
+                        found.append(keyword)
+            return hits
+        
+        for bucket, keywords in self._keyword_buckets:
+            found = [keyword for keyword in keywords if keyword in query_norm]
+            if found:
+                hits[bucket] = found
+        return hits
     
     def analyze_query(self, query: str) -> QueryIntent:
         """질문 분석하여 의도 파악"""
-        query = query.strip()
+        intent = self._analyze_query_cached(query.strip())
+        # 캐시된 결과의 리스트가 호출자 쪽에서 변경되지 않도록 얕은 복사본 반환
+        return replace(
+            intent,
+            years=list(intent.years),
+            entities=list(intent.entities),
+            metrics=list(intent.metrics),
+            comparison_items=list(intent.comparison_items),
+        )
+    
+    def _analyze_query(self, query: str) -> QueryIntent:
+        """공백이 정리된 질문의 의도 분석 (캐시되지 않은 실제 분석)"""
+        # 정규화는 한 번만 하고 모든 키워드 기반 판별에서 재사용
+        query_norm = _normalize_text(query)
         
         # 연도 추출
         years = self._extract_years(query)
         
+        # 키워드 스캔 (질문 타입/엔티티/메트릭 판별에 공통 사용)
+        hits = self._scan_keywords(query_norm)
+        
         # 질문 타입 분류
-        query_type = self._classify_query_type(query)
+        query_type = self._classify_query_type(query, hits, query_norm)
         
         # 차트 타입 결정
         chart_type = self._determine_chart_type(query_type, years)
         
         # 엔티티 추출 (분야, 기업 등)
-        entities = self._extract_entities(query)
+        entities = self._extract_entities(query, hits)
         
         # 메트릭 추출
-        metrics = self._extract_metrics(query)
+        metrics = self._extract_metrics(query, hits)
         
         # 비교 항목 추출
         comparison_items = self._extract_comparison_items(query)
@@ -116,7 +255,7 @@ class QueryAnalyzer:
         time_period = self._determine_time_period(years)
         
         # 집계 방법 결정
-        aggregation = self._determine_aggregation(query)
+        aggregation = self._determine_aggregation(query, hits)
         
         # 신뢰도 계산
         confidence = self._calculate_confidence(query, query_type, years, entities, metrics)
@@ -135,40 +274,28 @@ class QueryAnalyzer:
     
     def _extract_years(self, query: str) -> List[int]:
         """질문에서 연도 추출"""
-        years = []
-        matches = re.findall(self.year_pattern, query)
-        for match in matches:
-            year = int(match)
+        years = set()
+        for match in _YEAR_RE.finditer(query):
+            year = int(match.group(1))
             if 1990 <= year <= 2030:  # 합리적인 연도 범위
-                years.append(year)
-        return sorted(list(set(years)))
+                years.add(year)
+        return sorted(years)
     
-    def _classify_query_type(self, query: str) -> QueryType:
+    def _classify_query_type(self, query: str, hits: Optional[Dict[str, List[str]]] = None,
+                             query_norm: Optional[str] = None) -> QueryType:
         """질문 타입 분류"""
-        query_lower = query.lower()
-        
-        # 비교 질문 검사
-        if any(keyword in query_lower for keyword in self.comparison_keywords):
-            return QueryType.COMPARISON
+        if query_norm is None:
+            query_norm = _normalize_text(query)
+        if hits is None:
+            hits = self._scan_keywords(query_norm)
         
-        # 추세 질문 검사
-        if any(keyword in query_lower for keyword in self.trend_keywords):
-            return QueryType.TREND
-        
-        # 순위 질문 검사
-        if any(keyword in query_lower for keyword in self.ranking_keywords):
-            return QueryType.RANKING
-        
-        # 통계 질문 검사
-        if any(keyword in query_lower for keyword in self.statistics_keywords):
-            return QueryType.STATISTICS
-        
-        # 상관관계 질문 검사
-        if any(keyword in query_lower for keyword in self.correlation_keywords):
-            return QueryType.CORRELATION
+        # 비교 > 추세 > 순위 > 통계 > 상관관계 순으로 검사
+        for bucket, query_type in self._QUERY_TYPE_PRIORITY:
+            if bucket in hits:
+                return query_type
         
         # 특정 값 조회 (숫자나 "얼마" 포함)
-        if re.search(r'얼마|몇|수치|값|량', query_lower):
+        if _SPECIFIC_VALUE_RE.search(query_norm):
             return QueryType.SPECIFIC_VALUE
         
         return QueryType.SUMMARY
@@ -194,25 +321,17 @@ class QueryAnalyzer:
         else:
             return ChartType.BAR  # 기본값
     
-    def _extract_entities(self, query: str) -> List[str]:
+    def _extract_entities(self, query: str, hits: Optional[Dict[str, List[str]]] = None) -> List[str]:
         """질문에서 분야/산업 엔티티 추출"""
-        entities = []
-        query_lower = query.lower()
-        
-        for sector, keywords in self.sector_keywords.items():
-            if any(keyword in query_lower for keyword in keywords):
-                entities.append(sector)
-        
-        return entities
+        if hits is None:
+            hits = self._scan_keywords(_normalize_text(query))
+        return [sector for sector in self.sector_keywords if f'sector:{sector}' in hits]
     
-    def _extract_metrics(self, query: str) -> List[str]:
+    def _extract_metrics(self, query: str, hits: Optional[Dict[str, List[str]]] = None) -> List[str]:
         """질문에서 메트릭 추출"""
-        metrics = []
-        query_lower = query.lower()
-        
-        for metric, keywords in self.metric_keywords.items():
-            if any(keyword in query_lower for keyword in keywords):
-                metrics.append(metric)
+        if hits is None:
+            hits = self._scan_keywords(_normalize_text(query))
+        metrics = [metric for metric in self.metric_keywords if f'metric:{metric}' in hits]
         
         # 기본값으로 배출량 추가 (명시되지 않은 경우)
         if not metrics:
@@ -225,16 +344,8 @@ class QueryAnalyzer:
         comparison_items = []
         
         # "A와 B 비교" 패턴 찾기
-        patterns = [
-            r'(\w+)와\s*(\w+)',
-            r'(\w+)과\s*(\w+)',
-            r'(\w+)\s*vs\s*(\w+)',
-            r'(\w+)\s*대비\s*(\w+)'
-        ]
-        
-        for pattern in patterns:
-            matches = re.findall(pattern, query)
-            for match in matches:
+        for pattern in _COMPARISON_ITEM_RES:
+            for match in pattern.findall(query):
                 comparison_items.extend(match)
         
         return comparison_items
@@ -251,20 +362,16 @@ class QueryAnalyzer:
             # 연도가 없는 경우 전체 범위
             return (2017, 2021)  # 데이터 범위에 맞춤
     
-    def _determine_aggregation(self, query: str) -> Optional[str]:
+    def _determine_aggregation(self, query: str, hits: Optional[Dict[str, List[str]]] = None,
+                               query_norm: Optional[str] = None) -> Optional[str]:
         """집계 방법 결정"""
-        query_lower = query.lower()
-        
-        if any(word in query_lower for word in ['평균', 'average', 'avg']):
-            return 'mean'
-        elif any(word in query_lower for word in ['총', '합계', '전체', 'total', 'sum']):
-            return 'sum'
-        elif any(word in query_lower for word in ['최대', '최고', 'max', 'maximum']):
-            return 'max'
-        elif any(word in query_lower for word in ['최소', '최저', 'min', 'minimum']):
-            return 'min'
-        else:
-            return 'sum'  # 기본값
+        if hits is None:
+            hits = self._scan_keywords(query_norm if query_norm is not None else _normalize_text(query))
+        
+        for agg, _ in self._AGGREGATION_KEYWORDS:
+            if f'agg:{agg}' in hits:
+                return agg
+        return 'sum'  # 기본값
     
     def _calculate_confidence(self, query: str, query_type: QueryType, 
                             years: List[int], entities: List[str], 
@@ -355,63 +462,40 @@ class QueryAnalyzer:
         return "데이터 분석 결과"
     
     def needs_visualization(self, question: str) -> bool:
-        """질문이 시각화를 필요로 하는지 판단"""
-        # 차트 생성 키워드 체크
-        chart_keywords = [
-            '그래프', '차트', '그려줘', '그려주세요', '시각화', 
-            '막대그래프', '선그래프', '파이차트', '도표', '도식',
-            '보여줘', '보여주세요', '그림', '차트로', '그래프로',
-            '표현해줘', '표현해주세요', '비교해줘', '비교해주세요'
-        ]
-        
-        question_lower = question.lower()
+        """질문이 시각화를 필요로 하는지 판단 (질문 단위 캐시)"""
+        return self._needs_visualization_cached(question)
+    
+    def _needs_visualization(self, question: str) -> bool:
+        """시각화 필요 여부 판단 (캐시되지 않은 실제 판단)"""
+        debug = logger.isEnabledFor(logging.DEBUG)
         
-        # 키워드가 포함된 경우에만 시각화 생성
-        has_chart_keyword = any(keyword in question_lower for keyword in chart_keywords)
+        # 차트 생성 키워드 체크 (키워드가 포함된 경우에만 시각화 생성)
+        found_keywords = self._scan_keywords(_normalize_text(question)).get('chart', [])
+        has_chart_keyword = bool(found_keywords)
         
-        print(f"🔍 시각화 키워드 검사: '{question}'")
-        print(f"   - 발견된 키워드: {[kw for kw in chart_keywords if kw in question_lower]}")
-        print(f"   - 키워드 기반 시각화 필요: {has_chart_keyword}")
+        if debug:
+            found_keywords = [kw for kw in self._chart_keywords_norm if kw in found_keywords]  # 키워드 목록 순서 유지
+            logger.debug("🔍 시각화 키워드 검사: '%s'", question)
+            logger.debug("   - 발견된 키워드: %s", found_keywords)
+            logger.debug("   - 키워드 기반 시각화 필요: %s", has_chart_keyword)
         
         # 키워드가 있으면 바로 True 반환
         if has_chart_keyword:
-            print(f"   ✅ 시각화 키워드 발견으로 시각화 생성")
+            logger.debug("   ✅ 시각화 키워드 발견으로 시각화 생성")
             return True
         
         # 키워드가 없는 경우에만 패턴 매칭 확인
-        comparison_patterns = [
-            r'(\d{4})년.*(\d{4})년.*비교',
-            r'비교.*(\d{4})년.*(\d{4})년',
-            r'(\d{4}).*vs.*(\d{4})',
-            r'(\d{4}).*대비.*(\d{4})',
-            r'차이.*(\d{4}).*(\d{4})'
-        ]
+        if _VIZ_COMPARISON_RE.search(question):
+            logger.debug("   ✅ 비교 패턴 발견으로 시각화 생성")
+            return True
         
-        trend_patterns = [
-            r'추이', r'변화', r'트렌드', r'경향',
-            r'증가', r'감소', r'변동'
-        ]
+        if _VIZ_TREND_RE.search(question):
+            logger.debug("   ✅ 트렌드 패턴 발견으로 시각화 생성")
+            return True
         
-        ranking_patterns = [
-            r'순위', r'랭킹', r'많은', r'적은',
-            r'최대', r'최소', r'상위', r'하위'
-        ]
+        if _VIZ_RANKING_RE.search(question):
+            logger.debug("   ✅ 순위 패턴 발견으로 시각화 생성")
+            return True
         
-        # 패턴 매칭
-        for pattern in comparison_patterns:
-            if re.search(pattern, question):
-                print(f"   ✅ 비교 패턴 발견으로 시각화 생성")
-                return True
-                
-        for pattern in trend_patterns:
-            if re.search(pattern, question):
-                print(f"   ✅ 트렌드 패턴 발견으로 시각화 생성")
-                return True
-                
-        for pattern in ranking_patterns:
-            if re.search(pattern, question):
-                print(f"   ✅ 순위 패턴 발견으로 시각화 생성")
-                return True
-        
-        print(f"   ❌ 시각화 키워드나 패턴을 찾지 못함")
-        return False 
\ No newline at end of file
+        logger.debug("   ❌ 시각화 키워드나 패턴을 찾지 못함")
+        return False
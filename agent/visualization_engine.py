@@ -11,20 +11,32 @@ import numpy as np
 from typing import Dict, List, Tuple, Optional, Any
 import base64
 from io import BytesIO
-from PIL import Image
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import warnings
 import os
+import threading
+from functools import wraps
+from matplotlib.figure import Figure
 from matplotlib.ticker import FuncFormatter
-from scipy import stats  # Z-score 계산용 추가
 
 warnings.filterwarnings('ignore')
 
+def _serialized(method):
+    """재사용 Figure를 그리는 메서드를 엔진 단위 락으로 직렬화"""
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._render_lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
 class VisualizationEngine:
     """동적 차트 생성 클래스"""
     
+    # 이 개수 미만의 데이터 포인트는 이상값 판단이 의미 없으므로 통계 계산 없이 그대로 사용
+    _MIN_OUTLIER_SAMPLES = 20
+    
     def __init__(self):
         """시각화 엔진 초기화"""
         # 한글 폰트 설정
@@ -37,12 +49,28 @@ class VisualizationEngine:
             'vibrant': ['#FF6B6B', '#4ECDC4', '#45B7D1', '#96CEB4', '#FFEAA7', '#DDA0DD']
         }
         
+        # Y축 포맷터는 자릿수 구간별로 한 번만 생성해 재사용
+        self._fmt_big = FuncFormatter(lambda x, p: f"{x:,.0f}" if x != 0 else "0")
+        self._fmt_small = FuncFormatter(lambda x, p: f"{x:.1f}" if x != 0 else "0")
+        
         # 기본 스타일 설정
         plt.style.use('default')
         sns.set_palette("husl")
         
+        # 차트마다 Figure/캔버스를 새로 만들지 않고 하나를 비워서 재사용 (pyplot 전역 Figure 목록과 분리)
+        self._fig = Figure(figsize=(9, 6))
+        self._render_lock = threading.RLock()
+    
+    def _new_chart(self) -> Tuple[Figure, Any]:
+        """재사용 Figure를 비우고 새 축과 함께 (fig, ax) 반환"""
+        fig = self._fig
+        # ax.clear()는 파이 차트의 aspect/frame 설정이나 히트맵 컬러바 축을 남기므로 축은 새로 생성
+        fig.clear()
+        return fig, fig.add_subplot()
+        
     def _setup_korean_font(self):
-        """한글 폰트 설정"""
+        """한글 폰트 설정 (결정된 폰트 이름은 차트마다 재사용하도록 저장)"""
+        self._korean_font = 'DejaVu Sans'
         try:
             # matplotlib 폰트 캐시 클리어 (안전하게)
             try:
@@ -73,11 +101,7 @@ class VisualizationEngine:
                         # matplotlib 설정
                         plt.rcParams['font.family'] = font_name
                         plt.rcParams['axes.unicode_minus'] = False
-                        
-                        # 한글 테스트
-                        test_fig, test_ax = plt.subplots(figsize=(1, 1))
-                        test_ax.text(0.5, 0.5, '한글테스트', fontsize=12)
-                        plt.close(test_fig)
+                        self._korean_font = font_name
                         
                         korean_font_found = True
                         print(f"✅ 한글 폰트 설정 성공: {font_name} ({font_path})")
@@ -90,12 +114,13 @@ class VisualizationEngine:
             if not korean_font_found:
                 # 시스템 폰트 이름으로 시도
                 korean_fonts = ['Malgun Gothic', 'NanumGothic', 'Gulim', 'Dotum', 'Batang']
-                available_fonts = [f.name for f in fm.fontManager.ttflist]
+                available_fonts = {f.name for f in fm.fontManager.ttflist}
                 
                 for font in korean_fonts:
                     if font in available_fonts:
                         plt.rcParams['font.family'] = font
                         plt.rcParams['axes.unicode_minus'] = False
+                        self._korean_font = font
                         korean_font_found = True
                         print(f"✅ 시스템 한글 폰트 설정: {font}")
                         break
@@ -111,19 +136,9 @@ class VisualizationEngine:
             plt.rcParams['axes.unicode_minus'] = False
     
     def _ensure_korean_font(self):
-        """차트 생성 전 한글 폰트 재확인"""
-        # 매번 폰트 설정 재적용
-        try:
-            if os.path.exists('C:/Windows/Fonts/malgun.ttf'):
-                font_prop = fm.FontProperties(fname='C:/Windows/Fonts/malgun.ttf')
-                plt.rcParams['font.family'] = font_prop.get_name()
-            elif 'Malgun Gothic' in [f.name for f in fm.fontManager.ttflist]:
-                plt.rcParams['font.family'] = 'Malgun Gothic'
-            else:
-                plt.rcParams['font.family'] = 'Gulim'
-            plt.rcParams['axes.unicode_minus'] = False
-        except:
-            pass
+        """차트 생성 전 한글 폰트 재적용 (초기화 시 결정된 폰트 사용, 폰트 목록 재탐색 없음)"""
+        plt.rcParams['font.family'] = self._korean_font
+        plt.rcParams['axes.unicode_minus'] = False
     
     def _format_value_smart(self, value: float) -> str:
         """값을 읽기 쉬운 형태로 포맷팅 (국가 온실가스 인벤토리 데이터는 이미 백만톤 단위)"""
@@ -137,16 +152,15 @@ class VisualizationEngine:
     
     def _get_smart_formatter(self, values: pd.Series) -> FuncFormatter:
         """데이터 범위에 따른 스마트 포맷터 생성 (국가 온실가스 인벤토리 데이터용)"""
-        max_val = abs(values).max()
+        # 절댓값 Series를 만들지 않고 최솟값/최댓값 두 번의 축약으로 최대 절댓값 계산
+        max_val = max(abs(values.min()), abs(values.max()))
         
         # 국가 온실가스 인벤토리 데이터는 이미 백만톤 CO₂ 단위
-        # 따라서 추가 변환 없이 단위만 표시
-        if max_val >= 1e6:
-            return FuncFormatter(lambda x, p: f"{x:,.0f}" if x != 0 else "0")
-        elif max_val >= 1e3:
-            return FuncFormatter(lambda x, p: f"{x:,.0f}" if x != 0 else "0")
+        # 따라서 추가 변환 없이 단위만 표시 (천 이상은 정수, 미만은 소수 첫째 자리)
+        if max_val >= 1e3:
+            return self._fmt_big
         else:
-            return FuncFormatter(lambda x, p: f"{x:.1f}" if x != 0 else "0")
+            return self._fmt_small
     
     def _apply_smart_y_limits(self, ax, values: pd.Series):
         """데이터에 적합한 Y축 범위 설정"""
@@ -179,18 +193,36 @@ class VisualizationEngine:
         
         print(f"📊 Y축 범위 설정: {y_min:,.0f} ~ {y_max:,.0f}")
     
-    def _detect_and_handle_outliers(self, data: pd.DataFrame, method: str = 'iqr') -> pd.DataFrame:
+    @staticmethod
+    def _value_array(data: pd.DataFrame) -> np.ndarray:
+        """값 컬럼을 float ndarray로 변환 (결측은 NaN)"""
+        return data['value'].to_numpy(dtype=float, na_value=np.nan)
+    
+    def _handle_outliers(self, data: pd.DataFrame) -> pd.DataFrame:
+        """이상값 처리 전략 결정과 제거를 값 배열 한 번 변환으로 수행"""
+        if 'value' not in data.columns or len(data) < self._MIN_OUTLIER_SAMPLES:
+            return data
+        
+        values = self._value_array(data)
+        outlier_strategy = self._determine_outlier_strategy(data, values)
+        if outlier_strategy != 'none':
+            data = self._detect_and_handle_outliers(data, outlier_strategy, values)
+        return data
+    
+    def _detect_and_handle_outliers(self, data: pd.DataFrame, method: str = 'iqr',
+                                    values: Optional[np.ndarray] = None) -> pd.DataFrame:
         """이상값 탐지 및 처리 (더 적극적)"""
-        if 'value' not in data.columns or data.empty:
+        if 'value' not in data.columns or len(data) < self._MIN_OUTLIER_SAMPLES:
             return data
         
-        data_clean = data.copy()
-        original_count = len(data_clean)
+        # 값 컬럼을 한 번만 ndarray로 변환해 경계/마스크 계산 (결측은 pandas quantile처럼 제외)
+        if values is None:
+            values = self._value_array(data)
+        original_count = len(values)
         
         if method == 'iqr':
             # IQR 방법 (더 엄격하게)
-            q1 = data_clean['value'].quantile(0.25)
-            q3 = data_clean['value'].quantile(0.75)
+            q1, q3 = np.nanquantile(values, [0.25, 0.75])
             iqr = q3 - q1
             
             # 이상값 범위 (더 엄격하게 설정)
@@ -198,56 +230,57 @@ class VisualizationEngine:
             upper_bound = q3 + 1.5 * iqr
             
             # 이상값 제거
-            outliers_mask = (data_clean['value'] < lower_bound) | (data_clean['value'] > upper_bound)
+            outliers_mask = (values < lower_bound) | (values > upper_bound)
             outliers_count = outliers_mask.sum()
             
             if outliers_count > 0 and outliers_count < original_count * 0.9:  # 90% 이상 제거하지 않음
                 print(f"⚠️ IQR 이상값 {outliers_count}개 제거 (범위: {lower_bound:,.0f} ~ {upper_bound:,.0f})")
-                data_clean = data_clean[~outliers_mask]
+                return data.iloc[~outliers_mask]
         
         elif method == 'percentile':
             # 백분위수 방법 (상위/하위 5% 제거)
-            lower_bound = data_clean['value'].quantile(0.05)
-            upper_bound = data_clean['value'].quantile(0.95)
+            lower_bound, upper_bound = np.nanquantile(values, [0.05, 0.95])
             
-            outliers_mask = (data_clean['value'] < lower_bound) | (data_clean['value'] > upper_bound)
+            outliers_mask = (values < lower_bound) | (values > upper_bound)
             outliers_count = outliers_mask.sum()
             
             if outliers_count > 0:
                 print(f"⚠️ 상하위 5% 이상값 {outliers_count}개 제거")
-                data_clean = data_clean[~outliers_mask]
+                return data.iloc[~outliers_mask]
         
         elif method == 'zscore':
             # Z-score 방법 (|z| > 2.5인 값 제거)
-            z_scores = np.abs(stats.zscore(data_clean['value']))
+            z_scores = np.abs((values - values.mean()) / values.std())
             outliers_mask = z_scores > 2.5
             outliers_count = outliers_mask.sum()
             
             if outliers_count > 0 and outliers_count < original_count * 0.9:
                 print(f"⚠️ Z-score 이상값 {outliers_count}개 제거 (|z| > 2.5)")
-                data_clean = data_clean[~outliers_mask]
+                return data.iloc[~outliers_mask]
         
-        return data_clean
+        return data
     
-    def _determine_outlier_strategy(self, data: pd.DataFrame) -> str:
+    def _determine_outlier_strategy(self, data: pd.DataFrame,
+                                    values: Optional[np.ndarray] = None) -> str:
         """데이터 특성에 따른 이상값 처리 전략 결정 (더 적극적)"""
-        if 'value' not in data.columns or data.empty:
+        if 'value' not in data.columns or len(data) < self._MIN_OUTLIER_SAMPLES:
             return 'none'
         
-        values = data['value']
+        if values is None:
+            values = self._value_array(data)
         
-        # 기본 통계
-        std_dev = values.std()
-        mean_val = values.mean()
+        # 기본 통계 (pandas와 같이 결측 제외, 표준편차는 표본 표준편차)
+        std_dev = np.nanstd(values, ddof=1)
+        mean_val = np.nanmean(values)
         cv = std_dev / mean_val if mean_val != 0 else float('inf')  # 변동계수
         
         # 범위 차이
-        max_val = values.max()
-        min_val = values.min()
+        max_val = np.nanmax(values)
+        min_val = np.nanmin(values)
         range_ratio = max_val / abs(min_val) if min_val != 0 else float('inf')
         
         # 중앙값과 평균의 차이
-        median_val = values.median()
+        median_val = np.nanmedian(values)
         median_mean_ratio = abs(median_val - mean_val) / mean_val if mean_val != 0 else 0
         
         print(f"📊 데이터 특성 분석: CV={cv:.2f}, 범위비율={range_ratio:.2f}, 중앙값-평균비율={median_mean_ratio:.2f}")
@@ -262,6 +295,7 @@ class VisualizationEngine:
         else:
             return 'none'
     
+    @_serialized
     def create_visualization(self, data: pd.DataFrame, chart_type: str, 
                            title: str, params: Dict[str, Any]) -> Optional[str]:
         """
@@ -309,16 +343,14 @@ class VisualizationEngine:
         """선 그래프 생성"""
         self._ensure_korean_font()  # 한글 폰트 재설정
         
-        # 이상값 처리 전략 결정
-        outlier_strategy = self._determine_outlier_strategy(data)
-        if outlier_strategy != 'none':
-            data = self._detect_and_handle_outliers(data, outlier_strategy)
+        # 이상값 처리 전략 결정 및 제거
+        data = self._handle_outliers(data)
         
         if data.empty:
             print("⚠️ 이상값 제거 후 데이터가 비어있습니다.")
             return None
             
-        fig, ax = plt.subplots(figsize=(9, 6))
+        fig, ax = self._new_chart()
         
         # 데이터 그룹화 및 집계
         if 'dataset' in data.columns:
@@ -328,9 +360,11 @@ class VisualizationEngine:
             all_values = grouped['value']
             formatter = self._get_smart_formatter(all_values)
             
-            for dataset in grouped['dataset'].unique():
-                dataset_data = grouped[grouped['dataset'] == dataset]
-                ax.plot(dataset_data['year'], dataset_data['value'], 
+            # 데이터셋별 행 위치를 한 번에 구해 반복 비교 마스크 없이 그리기
+            years = grouped['year'].to_numpy()
+            values = all_values.to_numpy()
+            for dataset, idx in grouped.groupby('dataset', sort=False).indices.items():
+                ax.plot(years[idx], values[idx], 
                        marker='o', linewidth=2, label=dataset, markersize=6)
             
             ax.legend(bbox_to_anchor=(1.05, 1), loc='upper left')
@@ -359,7 +393,7 @@ class VisualizationEngine:
         ax.set_ylabel('배출량 (백만톤 CO₂)', fontsize=12)
         ax.grid(True, alpha=0.3)
         
-        plt.tight_layout()
+        fig.tight_layout()
         return self._save_plot_to_base64(fig)
     
     def _create_bar_chart(self, data: pd.DataFrame, title: str, 
@@ -367,16 +401,14 @@ class VisualizationEngine:
         """막대 그래프 생성"""
         self._ensure_korean_font()  # 한글 폰트 재설정
         
-        # 이상값 처리 전략 결정
-        outlier_strategy = self._determine_outlier_strategy(data)
-        if outlier_strategy != 'none':
-            data = self._detect_and_handle_outliers(data, outlier_strategy)
+        # 이상값 처리 전략 결정 및 제거
+        data = self._handle_outliers(data)
         
         if data.empty:
             print("⚠️ 이상값 제거 후 데이터가 비어있습니다.")
             return None
         
-        fig, ax = plt.subplots(figsize=(9, 6))
+        fig, ax = self._new_chart()
         
         # 연도별 총합 계산 (비교 차트용)
         if 'year' in data.columns and len(data['year'].unique()) > 1:
@@ -440,13 +472,13 @@ class VisualizationEngine:
         ax.set_ylabel('배출량', fontsize=12)
         ax.grid(True, alpha=0.3, axis='y')
         
-        plt.tight_layout()
+        fig.tight_layout()
         return self._save_plot_to_base64(fig)
     
     def _create_pie_chart(self, data: pd.DataFrame, title: str, 
                          params: Dict[str, Any]) -> str:
         """파이 차트 생성"""
-        fig, ax = plt.subplots(figsize=(9, 6))
+        fig, ax = self._new_chart()
         
         # 데이터 집계
         if 'dataset' in data.columns:
@@ -473,13 +505,13 @@ class VisualizationEngine:
                 autotext.set_fontsize(10)
         
         ax.set_title(title, fontsize=14, fontweight='bold', pad=20)
-        plt.tight_layout()
+        fig.tight_layout()
         return self._save_plot_to_base64(fig)
     
     def _create_scatter_plot(self, data: pd.DataFrame, title: str, 
                            params: Dict[str, Any]) -> str:
         """산점도 생성"""
-        fig, ax = plt.subplots(figsize=(9, 6))
+        fig, ax = self._new_chart()
         
         if len(data.columns) >= 3:  # x, y 값이 있는 경우
             x_col = data.columns[0]
@@ -493,13 +525,13 @@ class VisualizationEngine:
         
         ax.set_title(title, fontsize=14, fontweight='bold', pad=20)
         ax.grid(True, alpha=0.3)
-        plt.tight_layout()
+        fig.tight_layout()
         return self._save_plot_to_base64(fig)
     
     def _create_heatmap(self, data: pd.DataFrame, title: str, 
                        params: Dict[str, Any]) -> str:
         """히트맵 생성"""
-        fig, ax = plt.subplots(figsize=(9, 6))
+        fig, ax = self._new_chart()
         
         # 피벗 테이블 생성
         if 'year' in data.columns and 'dataset' in data.columns:
@@ -512,13 +544,13 @@ class VisualizationEngine:
                        cmap='YlOrRd', ax=ax, cbar_kws={'label': '값'})
         
         ax.set_title(title, fontsize=14, fontweight='bold', pad=20)
-        plt.tight_layout()
+        fig.tight_layout()
         return self._save_plot_to_base64(fig)
     
     def _create_histogram(self, data: pd.DataFrame, title: str, 
                          params: Dict[str, Any]) -> str:
         """히스토그램 생성"""
-        fig, ax = plt.subplots(figsize=(9, 6))
+        fig, ax = self._new_chart()
         
         ax.hist(data['value'].dropna(), bins=30, alpha=0.7, 
                color=self.color_palettes['default'][0], edgecolor='black')
@@ -528,17 +560,19 @@ class VisualizationEngine:
         ax.set_ylabel('빈도', fontsize=12)
         ax.grid(True, alpha=0.3)
         
-        plt.tight_layout()
+        fig.tight_layout()
         return self._save_plot_to_base64(fig)
     
     def _create_box_plot(self, data: pd.DataFrame, title: str, 
                         params: Dict[str, Any]) -> str:
         """박스플롯 생성"""
-        fig, ax = plt.subplots(figsize=(9, 6))
+        fig, ax = self._new_chart()
         
         if 'dataset' in data.columns:
             datasets = data['dataset'].unique()[:8]  # 최대 8개
-            box_data = [data[data['dataset'] == dataset]['value'].dropna() 
+            dataset_rows = data.groupby('dataset', sort=False).indices
+            values = data['value']
+            box_data = [values.iloc[dataset_rows.get(dataset, [])].dropna() 
                        for dataset in datasets]
             
             box_plot = ax.boxplot(box_data, labels=datasets, patch_artist=True)
@@ -553,13 +587,13 @@ class VisualizationEngine:
         ax.set_ylabel('값', fontsize=12)
         ax.grid(True, alpha=0.3)
         
-        plt.tight_layout()
+        fig.tight_layout()
         return self._save_plot_to_base64(fig)
     
     def _create_area_chart(self, data: pd.DataFrame, title: str, 
                           params: Dict[str, Any]) -> str:
         """영역 차트 생성"""
-        fig, ax = plt.subplots(figsize=(9, 6))
+        fig, ax = self._new_chart()
         
         if 'year' in data.columns and 'dataset' in data.columns:
             # 스택 영역 차트
@@ -582,33 +616,22 @@ class VisualizationEngine:
         ax.set_ylabel('값', fontsize=12)
         ax.grid(True, alpha=0.3)
         
-        plt.tight_layout()
+        fig.tight_layout()
         return self._save_plot_to_base64(fig)
     
     def _save_plot_to_base64(self, fig) -> str:
-        """matplotlib 그래프를 base64 문자열로 변환"""
+        """matplotlib 그래프를 base64 문자열로 변환 (9x6인치 x 100dpi로 바로 900x600 PNG 생성, 재인코딩 없음)"""
         buffer = BytesIO()
-        fig.savefig(buffer, format='png', dpi=150, bbox_inches='tight',
+        fig.set_size_inches(9, 6)
+        fig.savefig(buffer, format='png', dpi=100,
                    facecolor='white', edgecolor='none')
-        buffer.seek(0)
         
-        # PIL로 크기 조정
-        image = Image.open(buffer)
-        image = image.resize((900, 600), Image.Resampling.LANCZOS)
-        
-        # 다시 buffer에 저장
-        resized_buffer = BytesIO()
-        image.save(resized_buffer, format='PNG')
-        resized_buffer.seek(0)
-        
-        image_base64 = base64.b64encode(resized_buffer.getvalue()).decode()
-        
-        plt.close(fig)  # 메모리 정리
+        image_base64 = base64.b64encode(buffer.getvalue()).decode()
         buffer.close()
-        resized_buffer.close()
         
         return image_base64
     
+    @_serialized
     def create_comparison_chart(self, data: pd.DataFrame, 
                               years: List[int], title: str) -> Optional[str]:
         """특정 연도들 간 비교 차트 생성"""
@@ -623,10 +646,8 @@ class VisualizationEngine:
         
         self._ensure_korean_font()  # 한글 폰트 재설정
         
-        # 이상값 처리 전략 결정
-        outlier_strategy = self._determine_outlier_strategy(filtered_data)
-        if outlier_strategy != 'none':
-            filtered_data = self._detect_and_handle_outliers(filtered_data, outlier_strategy)
+        # 이상값 처리 전략 결정 및 제거
+        filtered_data = self._handle_outliers(filtered_data)
         
         if filtered_data.empty:
             print("⚠️ 이상값 제거 후 데이터가 비어있습니다.")
@@ -635,7 +656,7 @@ class VisualizationEngine:
         # 연도별 총배출량 계산
         yearly_totals = filtered_data.groupby('year')['value'].sum().reset_index()
         
-        fig, ax = plt.subplots(figsize=(9, 6))
+        fig, ax = self._new_chart()
         
         # 스마트 포맷터 적용
         formatter = self._get_smart_formatter(yearly_totals['value'])
@@ -659,9 +680,10 @@ class VisualizationEngine:
         # Y축 포맷터 적용
         ax.yaxis.set_major_formatter(formatter)
         
-        plt.tight_layout()
+        fig.tight_layout()
         return self._save_plot_to_base64(fig)
     
+    @_serialized
     def create_trend_chart(self, data: pd.DataFrame, title: str) -> Optional[str]:
         """추세 차트 생성"""
         if data.empty:
@@ -669,10 +691,8 @@ class VisualizationEngine:
         
         self._ensure_korean_font()  # 한글 폰트 재설정
         
-        # 이상값 처리 전략 결정
-        outlier_strategy = self._determine_outlier_strategy(data)
-        if outlier_strategy != 'none':
-            data = self._detect_and_handle_outliers(data, outlier_strategy)
+        # 이상값 처리 전략 결정 및 제거
+        data = self._handle_outliers(data)
         
         if data.empty:
             print("⚠️ 이상값 제거 후 데이터가 비어있습니다.")
@@ -682,7 +702,7 @@ class VisualizationEngine:
         yearly_data = data.groupby('year')['value'].sum().reset_index()
         yearly_data = yearly_data.sort_values('year')
         
-        fig, ax = plt.subplots(figsize=(9, 6))
+        fig, ax = self._new_chart()
         
         # 스마트 포맷터 적용
         formatter = self._get_smart_formatter(yearly_data['value'])
@@ -718,5 +738,5 @@ class VisualizationEngine:
         # Y축 포맷터 적용
         ax.yaxis.set_major_formatter(formatter)
         
-        plt.tight_layout()
+        fig.tight_layout()
         return self._save_plot_to_base64(fig) 
\ No newline at end of file
@@ -0,0 +1,40 @@
+"""
+LLM 우회 패턴(_FASTPATH) 매칭 테스트
+단순 조회 질문만 직접 답변하고 나머지는 LLM으로 넘기는지 확인
+"""
+
+import pytest
+
+carbon_rag_agent = pytest.importorskip("agent.carbon_rag_agent")
+
+
+def _matched_handlers(query):
+    return [handler for pattern, handler in carbon_rag_agent._FASTPATH if pattern.search(query)]
+
+
+@pytest.mark.parametrize("query", [
+    "데이터에는 몇 개의 행이 있어?",
+    "이 데이터의 총 몇 개의 행이 있나요?",
+])
+def test_row_count_questions_use_fastpath(query):
+    assert _matched_handlers(query) == ['_answer_row_count']
+
+
+@pytest.mark.parametrize("query", [
+    "2017년 총배출량은?",
+    "2017년 총배출량은 얼마야?",
+    "2017년도의 총 배출량",
+])
+def test_total_emission_questions_use_fastpath(query):
+    assert _matched_handlers(query) == ['_answer_total_emission']
+
+
+@pytest.mark.parametrize("query", [
+    "배출권 거래를 진행한 기업은 몇 개야?",
+    "몇 개 은행이 참여했어?",
+    "2017년 총배출량은 왜 증가했어?",
+    "2017년 총배출량 변화 추이를 그래프로 보여줘",
+    "2017년 총배출량 차트로 그려줘",
+])
+def test_other_questions_go_to_llm(query):
+    assert _matched_handlers(query) == []